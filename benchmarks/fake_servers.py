@@ -0,0 +1,244 @@
+"""Local stand-ins for the WhatPulse client API and public API.
+
+Both servers replay realistic payloads after a configurable latency and
+count every request they serve, so benchmarks can run fully offline.
+The fake client serves any number of virtual clients, each under its own
+path prefix: http://127.0.0.1:<port>/<client>/v1/all-stats.
+"""
+
+import asyncio
+from collections import Counter
+import time
+
+from aiohttp import web
+
+
+class FakeServer:
+    """aiohttp server on a free local port with latency and request counting."""
+
+    def __init__(self, latency=0.0):
+        """Initialize the server."""
+        self.latency = latency
+        self.requests = Counter()
+        self._runner = None
+        self.port = None
+
+    @property
+    def url(self):
+        """Return the base URL of the running server."""
+        return f"http://127.0.0.1:{self.port}"
+
+    def _routes(self):
+        """Return the server's routes."""
+        raise NotImplementedError
+
+    async def async_start(self):
+        """Start serving on a free port."""
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes(self._routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def async_stop(self):
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def total_requests(self):
+        """Return the number of requests served so far."""
+        return sum(self.requests.values())
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        """Count the request and delay the response by the configured latency."""
+        resource = request.match_info.route.resource
+        self.requests[resource.canonical if resource else request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+
+class FakeWhatPulseClient(FakeServer):
+    """Stand-in for the client API of many WhatPulse clients."""
+
+    def __init__(self, latency=0.0):
+        """Initialize the fake clients."""
+        super().__init__(latency)
+        self._counters = {}
+
+    def client_url(self, index):
+        """Return the client API URL of one virtual client."""
+        return f"{self.url}/client{index}"
+
+    def _routes(self):
+        """Return the client API routes."""
+        return [
+            web.get("/{client}/v1/all-stats", self._all_stats),
+            web.get("/{client}/v1/realtime", self._subtree("realtime")),
+            web.get("/{client}/v1/unpulsed", self._subtree("unpulsed")),
+            web.get("/{client}/v1/account-totals", self._subtree("account-totals")),
+            web.post("/{client}/v1/pulse", self._pulse),
+            web.post("/{client}/v1/open-window", self._ok),
+            web.post("/{client}/v1/profiles/activate", self._ok),
+        ]
+
+    def _advance(self, client):
+        """Simulate input on a client and return its counters."""
+        counters = self._counters.setdefault(
+            client, {"keys": 0, "clicks": 0, "scrolls": 0, "download": 0.0, "upload": 0.0, "uptime": 0}
+        )
+        counters["keys"] += 37
+        counters["clicks"] += 11
+        counters["scrolls"] += 4
+        counters["download"] += 1.5
+        counters["upload"] += 0.25
+        counters["uptime"] += 30
+        return counters
+
+    def _payload(self, client):
+        """Return an all-stats payload for a client."""
+        counters = self._advance(client)
+        return {
+            "realtime": {
+                "keys": "1.23",
+                "clicks": "0.37",
+                "download": "12.5KB/s",
+                "upload": "1.25KB/s",
+            },
+            "unpulsed": dict(counters),
+            "account-totals": {
+                "keys": 12345678,
+                "clicks": 2345678,
+                "scrolls": 345678,
+                "download": 4567890.12,
+                "upload": 567890.12,
+                "uptime": 98765432,
+                "distance_miles": 1234.56,
+                "ranks": {
+                    "rank_keys": 1234,
+                    "rank_clicks": 2345,
+                    "rank_download": 3456,
+                    "rank_upload": 4567,
+                    "rank_uptime": 5678,
+                    "rank_scrolls": 6789,
+                    "rank_distance": 7890,
+                },
+            },
+        }
+
+    async def _all_stats(self, request):
+        """Serve all stats of a client."""
+        return web.json_response(self._payload(request.match_info["client"]))
+
+    def _subtree(self, subtree):
+        """Return a handler serving one subtree of a client."""
+
+        async def handler(request):
+            return web.json_response(self._payload(request.match_info["client"])[subtree])
+
+        return handler
+
+    async def _pulse(self, request):
+        """Reset a client's unpulsed counters."""
+        self._counters.pop(request.match_info["client"], None)
+        return web.json_response({"success": True})
+
+    async def _ok(self, request):
+        """Acknowledge an action."""
+        return web.json_response({"success": True})
+
+
+class FakeWhatPulsePublicAPI(FakeServer):
+    """Stand-in for api.whatpulse.org."""
+
+    def __init__(self, latency=0.0, team_size=50):
+        """Initialize the fake public API."""
+        super().__init__(latency)
+        self.team_size = team_size
+
+    def _routes(self):
+        """Return the public API routes."""
+        return [
+            web.get("/user.php", self._user),
+            web.get("/team.php", self._team),
+            web.get("/pulses.php", self._pulses),
+        ]
+
+    @staticmethod
+    def user_payload(user):
+        """Return a user.php payload."""
+        return {
+            "UserID": user,
+            "Username": f"user{user}",
+            "DateJoined": "2010-01-01",
+            "DateJoinedUnixTimestamp": "1262304000",
+            "Keys": "12345678",
+            "Clicks": "2345678",
+            "Scrolls": "345678",
+            "Download": "4.36TB",
+            "Upload": "554.58GB",
+            "DownloadMB": "4567890",
+            "UploadMB": "567890",
+            "UptimeSeconds": "98765432",
+            "UptimeShort": "3y7w2d3h",
+            "UptimeLong": "3 years, 7 weeks, 2 days, 3 hours",
+            "DistanceInMiles": "1234.56",
+            "Pulses": "4321",
+            "AvKeysPerPulse": "2857.1",
+            "AvClicksPerPulse": "542.8",
+            "AvKPS": "0.13",
+            "AvCPS": "0.02",
+            "LastPulse": "2024-01-01 12:00:00",
+            "LastPulseUnixTimestamp": str(int(time.time()) - 600),
+            "Ranks": {
+                "Keys": "1234",
+                "Clicks": "2345",
+                "Download": "3456",
+                "Upload": "4567",
+                "Uptime": "5678",
+                "Scrolls": "6789",
+                "Distance": "7890",
+            },
+            "Team": {"Name": "Benchmark", "Ranks": {"Keys": "12", "Clicks": "34"}},
+        }
+
+    async def _user(self, request):
+        """Serve a user."""
+        user = request.query.get("userid") or request.query.get("user") or "1"
+        return web.json_response(self.user_payload(user))
+
+    async def _team(self, request):
+        """Serve a team with its members."""
+        members = {}
+        for index in range(self.team_size):
+            member = self.user_payload(str(index + 1))
+            member["Keys"] = str(1000000 + index * 1000)
+            members[str(index)] = member
+
+        return web.json_response(
+            {"Team": {"Name": request.query.get("team"), "Members": members}}
+        )
+
+    async def _pulses(self, request):
+        """Serve one pulse every 6 hours of the requested range."""
+        start = int(request.query.get("start", 0))
+        end = int(request.query.get("end", start))
+        pulses = {
+            str(timestamp): {
+                "Timestamp": str(timestamp),
+                "Keys": "1234",
+                "Clicks": "321",
+                "Scrolls": "12",
+                "DownloadMB": "120.5",
+                "UploadMB": "12.5",
+                "UptimeSeconds": "21600",
+                "DistanceInMiles": "0.12",
+            }
+            for timestamp in range(start, end, 6 * 3600)
+        }
+        return web.json_response(pulses)
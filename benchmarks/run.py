@@ -0,0 +1,338 @@
+"""Benchmark the WhatPulse integration against local stand-in servers.
+
+Runs offline: a fake client API and a fake public API serve realistic
+payloads with a configurable latency. Run from the repository root, with
+Home Assistant's test helpers installed:
+
+    pip install pytest-homeassistant-custom-component
+    python -m benchmarks.run --output benchmark-results.json
+
+Every scenario starts a fresh Home Assistant instance, sets the platform up
+through its YAML configuration and forces full refreshes. The results file
+is JSON, so runs can be compared.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from homeassistant import loader
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+from custom_components.whatpulse import api as whatpulse_api
+from custom_components.whatpulse.const import (
+    DATA_COORDINATORS,
+    DATA_PUBLIC_SCHEDULER,
+    DOMAIN,
+    SENSOR_TYPES,
+)
+from custom_components.whatpulse.extraction import ExtractionPlan
+from custom_components.whatpulse.parsing import parse_duration, parse_size
+from custom_components.whatpulse.ratelimit import WhatPulsePublicScheduler
+
+from .fake_servers import FakeWhatPulseClient, FakeWhatPulsePublicAPI
+
+FLEET_SENSORS = ["RealtimeKeys", "RealtimeDownload", "UnpulsedKeys", "Keys"]
+
+
+class LoopLagMonitor:
+    """Measure how long the event loop is blocked by timing short sleeps."""
+
+    def __init__(self, interval=0.001):
+        """Initialize the monitor."""
+        self._interval = interval
+        self._task = None
+        self.blocked = 0.0
+        self.max_lag = 0.0
+
+    def start(self):
+        """Start measuring."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop measuring."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def reset(self):
+        """Reset the totals."""
+        self.blocked = 0.0
+        self.max_lag = 0.0
+
+    async def _run(self):
+        """Sleep over and over, accounting every late wakeup as blocked time."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            lag = time.perf_counter() - start - self._interval
+            if lag > 0:
+                self.blocked += lag
+                self.max_lag = max(self.max_lag, lag)
+
+
+def _summary(samples):
+    """Return mean and percentiles of a list of seconds, in milliseconds."""
+    if not samples:
+        return None
+
+    ordered = sorted(samples)
+
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "mean": sum(ordered) / len(ordered) * 1000,
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": ordered[-1] * 1000,
+    }
+
+
+def _force_due(coordinator):
+    """Make every source of a coordinator due on its next refresh."""
+    coordinator.api._last_refresh_client.clear()
+    coordinator.api._next_refresh_public = 0
+
+
+def _time_listeners(coordinator, cpu_times):
+    """Record the CPU time the coordinator spends updating its entities."""
+    update_listeners = coordinator.async_update_listeners
+
+    def timed_update_listeners():
+        start = time.process_time()
+        update_listeners()
+        cpu_times.append(time.process_time() - start)
+
+    coordinator.async_update_listeners = timed_update_listeners
+
+
+async def _async_run_scenario(args, servers, name, platform_config, parameters):
+    """Set up one platform configuration and measure forced refresh cycles."""
+    fake_client, fake_public = servers
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            # Allow loading the integration from custom_components
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            # Only the rate limiter's own cost is of interest here
+            hass.data.setdefault(DOMAIN, {})[DATA_PUBLIC_SCHEDULER] = WhatPulsePublicScheduler(
+                rate=args.public_rate, burst=args.public_rate
+            )
+
+            assert await async_setup_component(hass, "sensor", {"sensor": [platform_config]})
+            await hass.async_block_till_done()
+
+            coordinators = hass.data[DOMAIN][DATA_COORDINATORS]
+            entities = len(hass.states.async_entity_ids("sensor"))
+
+            cpu_times = []
+            for coordinator in coordinators:
+                _time_listeners(coordinator, cpu_times)
+
+            monitor = LoopLagMonitor()
+            monitor.start()
+
+            requests_before = fake_client.total_requests() + fake_public.total_requests()
+            monitor.reset()
+            latencies = []
+            for _ in range(args.cycles):
+                for coordinator in coordinators:
+                    _force_due(coordinator)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+                # Alongside the client, the public API refreshes in the background
+                await asyncio.gather(
+                    *(coordinator.api._public_task for coordinator in coordinators if coordinator.api._public_task)
+                )
+                latencies.append(time.perf_counter() - start)
+
+            requests = fake_client.total_requests() + fake_public.total_requests() - requests_before
+            await monitor.stop()
+
+    return {
+        "scenario": name,
+        **parameters,
+        "entities": entities,
+        "cycles": args.cycles,
+        "requests_per_cycle": requests / args.cycles,
+        "refresh_latency_ms": _summary(latencies),
+        "loop_blocked_ms_per_cycle": monitor.blocked / args.cycles * 1000,
+        "max_loop_lag_ms": monitor.max_lag * 1000,
+        "entity_update_cpu_us": (
+            sum(cpu_times) / max(1, len(cpu_times)) / max(1, entities) * 1e6
+        ),
+    }
+
+
+async def _async_run_buttons(args, fake_client):
+    """Measure the latency of button presses against the fake client."""
+    client_api_url = fake_client.client_url(0)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            assert await async_setup_component(
+                hass,
+                "button",
+                {"button": [{"platform": DOMAIN, "client_api_url": client_api_url, "api_type": "client"}]},
+            )
+            await hass.async_block_till_done()
+
+            entity_id = hass.states.async_entity_ids("button")[0]
+            latencies = []
+            for _ in range(args.cycles):
+                start = time.perf_counter()
+                await hass.services.async_call("button", "press", {"entity_id": entity_id}, blocking=True)
+                latencies.append(time.perf_counter() - start)
+
+    return {"scenario": "button", "presses": args.cycles, "press_latency_ms": _summary(latencies)}
+
+
+def _run_micro_benchmarks(args):
+    """Time the pure extraction and parsing code paths."""
+    results = []
+    public = FakeWhatPulsePublicAPI.user_payload("1")
+    client = FakeWhatPulseClient()._payload("client0")
+    data = {"public": public, "client": client}
+    fetched = {"public": 1, "realtime": 2, "unpulsed": 2, "account-totals": 2}
+
+    for count in args.sensors:
+        plan = ExtractionPlan(list(SENSOR_TYPES)[:count], SENSOR_TYPES)
+        number = 10000
+        seconds = timeit.timeit(lambda: plan.extract(data, fetched), number=number)
+        results.append(
+            {"scenario": "extraction", "sensors": count, "extract_us": seconds / number * 1e6}
+        )
+
+    number = 100000
+    for name, parser, text in (
+        ("size", parse_size.__wrapped__, "4.36TB"),
+        ("duration", parse_duration.__wrapped__, "3 years, 7 weeks, 2 days, 3 hours"),
+    ):
+        seconds = timeit.timeit(lambda: parser(text), number=number)
+        results.append({"scenario": "parse", "parser": name, "parse_us": seconds / number * 1e6})
+
+    return results
+
+
+def _git_revision():
+    """Return the current git revision, if known."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def async_main(args):
+    """Run every scenario and write the results file."""
+    fake_client = await FakeWhatPulseClient(args.latency).async_start()
+    fake_public = await FakeWhatPulsePublicAPI(args.latency).async_start()
+    servers = (fake_client, fake_public)
+
+    # Point the integration at the fake public API
+    whatpulse_api.PUBLIC_API_URL = f"{fake_public.url}/user.php?"
+    whatpulse_api.PUBLIC_PULSES_API_URL = f"{fake_public.url}/pulses.php?"
+    whatpulse_api.PUBLIC_TEAM_API_URL = f"{fake_public.url}/team.php?"
+
+    results = []
+    try:
+        for count in args.sensors:
+            results.append(
+                await _async_run_scenario(
+                    args,
+                    servers,
+                    "sensors",
+                    {
+                        "platform": DOMAIN,
+                        "userid": "1",
+                        "api_type": "both",
+                        "client_api_url": fake_client.client_url(0),
+                        "sensors": list(SENSOR_TYPES)[:count],
+                    },
+                    {"sensors": count, "clients": 1},
+                )
+            )
+            print(f"sensors={count}: {results[-1]['refresh_latency_ms']}", file=sys.stderr)
+
+        for count in args.clients:
+            results.append(
+                await _async_run_scenario(
+                    args,
+                    servers,
+                    "clients",
+                    {
+                        "platform": DOMAIN,
+                        "clients": [fake_client.client_url(index) for index in range(count)],
+                        "max_concurrency": args.max_concurrency,
+                        "fleet_jitter": 0,
+                        "sensors": FLEET_SENSORS,
+                    },
+                    {"sensors": len(FLEET_SENSORS), "clients": count},
+                )
+            )
+            print(f"clients={count}: {results[-1]['refresh_latency_ms']}", file=sys.stderr)
+
+        results.append(await _async_run_buttons(args, fake_client))
+        results.extend(_run_micro_benchmarks(args))
+    finally:
+        await fake_client.async_stop()
+        await fake_public.async_stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "home_assistant": HA_VERSION,
+            "latency_ms": args.latency * 1000,
+            "cycles": args.cycles,
+            "max_concurrency": args.max_concurrency,
+        },
+        "results": results,
+    }
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+
+def _int_list(value):
+    """Parse a comma separated list of integers."""
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    """Parse the command line and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark-results.json", help="results file (JSON)")
+    parser.add_argument("--cycles", type=int, default=20, help="forced refreshes per scenario")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server latency in seconds")
+    parser.add_argument("--sensors", type=_int_list, default=[1, 5, 10, 20, 40], help="sensor counts")
+    parser.add_argument("--clients", type=_int_list, default=[1, 10, 25, 50, 100], help="fleet client counts")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="fleet max_concurrency")
+    parser.add_argument(
+        "--public-rate", type=float, default=1000, help="public API requests per second allowed by the rate limiter"
+    )
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
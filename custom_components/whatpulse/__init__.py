@@ -8,6 +8,7 @@ from homeassistant.helpers.discovery import load_platform
 
 from .const import (
     DOMAIN,
+    DATA_HASS_CONFIG,
     CONF_API_TYPE,
     CONF_CLIENT_API_URL,
     API_TYPE_CLIENT,
@@ -22,6 +23,8 @@ PLATFORMS = ["sensor", "button"]
 
 async def async_setup(hass: HomeAssistant, config):
     """Set up the WhatPulse component from YAML."""
+    # Platforms loaded through discovery need the full configuration
+    hass.data.setdefault(DOMAIN, {})[DATA_HASS_CONFIG] = config
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
@@ -0,0 +1,719 @@
+"""WhatPulse API client."""
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from time import monotonic
+from urllib.parse import quote
+
+import aiohttp
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+from homeassistant.util.json import json_loads
+
+from .const import (
+    ADAPTIVE_BACKOFF_FACTOR,
+    API_TYPE_BOTH,
+    API_TYPE_CLIENT,
+    API_TYPE_PUBLIC,
+    BREAKER_HALF_OPEN,
+    CACHE_SAVE_DELAY,
+    CLIENT_ALL_STATS_ENDPOINT,
+    CLIENT_ENDPOINTS,
+    CLIENT_PULSE_ENDPOINT,
+    CLIENT_TIER_REFRESH_RATES,
+    CONNECT_TIMEOUT,
+    DATA_CLIENTS,
+    DATA_PUBLIC_SCHEDULER,
+    DATA_SESSION,
+    DEFAULT_API_TYPE,
+    DEFAULT_CLIENT_API_URL,
+    DOMAIN,
+    PROBE_TIMEOUT,
+    PUBLIC_PRIORITY_BACKGROUND,
+    PUBLIC_API_URL,
+    PUBLIC_PULSES_API_URL,
+    PUBLIC_TEAM_API_URL,
+    PULSE_PUBLIC_REFRESH_DELAY,
+    PULSE_SAFETY_REFRESH_RATE,
+    CLIENT_REFRESH_RATE,
+    PUBLIC_REFRESH_RATE,
+    PUBLIC_RETRY_RATE,
+    REQUEST_TIMEOUT,
+    STORAGE_VERSION,
+)
+
+from .breaker import CircuitBreaker
+from .metrics import WhatPulseMetrics, async_get_metrics
+from .ratelimit import WhatPulsePublicScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_session(hass):
+    """Return the HTTP session shared by every WhatPulse request.
+
+    It is separate from Home Assistant's shared session so that requests
+    can be traced phase by phase.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+
+    if DATA_SESSION not in data:
+        data[DATA_SESSION] = async_create_clientsession(
+            hass, trace_configs=[WhatPulseMetrics.trace_config()]
+        )
+
+    return data[DATA_SESSION]
+
+
+def async_get_client(hass, client_api_url):
+    """Return the shared client transport for a client API URL."""
+    clients = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_CLIENTS, {})
+
+    if client_api_url not in clients:
+        clients[client_api_url] = WhatPulseClient(
+            async_get_session(hass), client_api_url, async_get_metrics(hass)
+        )
+
+    return clients[client_api_url]
+
+
+async def _async_read_json(response, timings):
+    """Read and decode a JSON response, timing transfer and decode."""
+    start = monotonic()
+    body = await response.read()
+    timings["transfer"] = monotonic() - start
+    timings["bytes"] = len(body)
+
+    start = monotonic()
+    data = json_loads(body)
+    timings["decode"] = monotonic() - start
+
+    return data
+
+
+def async_get_public_scheduler(hass):
+    """Return the rate limiter shared by every public API request."""
+    data = hass.data.setdefault(DOMAIN, {})
+
+    if DATA_PUBLIC_SCHEDULER not in data:
+        data[DATA_PUBLIC_SCHEDULER] = WhatPulsePublicScheduler()
+
+    return data[DATA_PUBLIC_SCHEDULER]
+
+
+async def _async_public_get(hass, breaker, url, headers=None, priority=0):
+    """GET a public API URL, returning (status, data, headers) or None.
+
+    The request waits for the shared rate limiter; lower priorities go first.
+    """
+    if not breaker.allow_request():
+        _LOGGER.debug("Skipping public API request, api.whatpulse.org is unreachable")
+        return None
+
+    metrics = async_get_metrics(hass).endpoint(url.split("?", 1)[0])
+    timings = {}
+
+    try:
+        scheduler = async_get_public_scheduler(hass)
+        await scheduler.async_acquire(priority)
+
+        start = monotonic()
+        async with async_get_session(hass).get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            trace_request_ctx=timings,
+        ) as response:
+            breaker.record_success()
+
+            if response.status == 429:
+                scheduler.defer(response.headers.get("Retry-After"))
+                metrics.record_failure("HTTP 429", timings)
+                return None
+
+            if response.status == 304:
+                timings["total"] = monotonic() - start
+                metrics.record_success(timings)
+                return response.status, None, response.headers
+
+            if response.status != 200:
+                text = await response.text()
+                metrics.record_failure(f"HTTP {response.status}", timings)
+                _LOGGER.error(f"Unable to perform public API request: {text}")
+                return None
+
+            data = await _async_read_json(response, timings)
+            timings["total"] = monotonic() - start
+            metrics.record_success(timings, timings["bytes"])
+            return response.status, data, response.headers
+
+    except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
+        breaker.record_failure()
+        metrics.record_failure(repr(ex), timings)
+        _LOGGER.error(f"Error fetching WhatPulse public API data: {ex}")
+        return None
+
+    except ValueError as ex:
+        metrics.record_failure(repr(ex), timings)
+        _LOGGER.error(f"Error decoding WhatPulse public API data: {ex}")
+        return None
+
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+
+
+class WhatPulseClient:
+    """Async transport for a single WhatPulse client API."""
+
+    def __init__(self, session, client_api_url, metrics):
+        """Initialize the client transport."""
+        self._session = session
+        self._client_api_url = client_api_url
+        self._metrics = metrics
+        self._pulse_listeners = []
+        self.breaker = CircuitBreaker()
+
+    @property
+    def url(self):
+        """Return the base URL of the client API."""
+        return self._client_api_url
+
+    def _timeout(self):
+        """Return the timeout for the next request, short while probing."""
+        if self.breaker.state == BREAKER_HALF_OPEN:
+            return aiohttp.ClientTimeout(total=PROBE_TIMEOUT)
+        return aiohttp.ClientTimeout(total=REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+    async def async_get(self, endpoint):
+        """Perform a GET request against the client API and decode the JSON."""
+        if not self.breaker.allow_request():
+            _LOGGER.debug(f"Skipping request to {self._client_api_url}{endpoint}, client is unreachable")
+            return False
+
+        url = f"{self._client_api_url}{endpoint}"
+        metrics = self._metrics.endpoint(url)
+        timings = {}
+
+        try:
+            start = monotonic()
+            async with self._session.get(url, timeout=self._timeout(), trace_request_ctx=timings) as response:
+                self.breaker.record_success()
+
+                if response.status != 200:
+                    text = await response.text()
+                    metrics.record_failure(f"HTTP {response.status}", timings)
+                    _LOGGER.error(f"Unable to perform client API request: {text}")
+                    return False
+
+                data = await _async_read_json(response, timings)
+                timings["total"] = monotonic() - start
+                metrics.record_success(timings, timings["bytes"])
+                return data
+
+        except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
+            self.breaker.record_failure()
+            metrics.record_failure(repr(ex), timings)
+            _LOGGER.error(f"Error fetching WhatPulse client API data: {ex}")
+            return False
+
+        except ValueError as ex:
+            metrics.record_failure(repr(ex), timings)
+            _LOGGER.error(f"Error decoding WhatPulse client API data: {ex}")
+            return False
+
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+    async def async_post(self, endpoint, payload=None):
+        """Perform a POST request against the client API."""
+        # Actions are user-initiated, so reject them outright instead of
+        # letting the caller wait on a client that is known to be down
+        if not self.breaker.allow_request():
+            raise HomeAssistantError(
+                f"WhatPulse client at {self._client_api_url} is unreachable, retrying in {self.breaker.retry_in} seconds"
+            )
+
+        url = f"{self._client_api_url}{endpoint}"
+
+        try:
+            async with self._session.post(url, json=payload, timeout=self._timeout()) as response:
+                self.breaker.record_success()
+
+                if response.status != 200:
+                    _LOGGER.error(f"Client API request to {endpoint} failed: {response.status}, {await response.text()}")
+                    return False
+
+        except (asyncio.TimeoutError, aiohttp.ClientError) as ex:
+            self.breaker.record_failure()
+            _LOGGER.error(f"Error calling WhatPulse client API {endpoint}: {ex}")
+            return False
+
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+        if endpoint == CLIENT_PULSE_ENDPOINT:
+            self.notify_pulse()
+
+        return True
+
+    def add_pulse_listener(self, listener):
+        """Register a callback invoked when a pulse is observed on this client."""
+        self._pulse_listeners.append(listener)
+
+        def remove_listener():
+            self._pulse_listeners.remove(listener)
+
+        return remove_listener
+
+    def notify_pulse(self):
+        """Inform all listeners that this client has pulsed."""
+        for listener in list(self._pulse_listeners):
+            listener()
+
+
+class WhatPulseAPI:
+    """Class to handle WhatPulse API calls."""
+
+    def __init__(self, hass, username=None, userid=None, api_type=DEFAULT_API_TYPE, client_api_url=DEFAULT_CLIENT_API_URL, client_subtrees=None):
+        """Initialize the API."""
+        self._hass = hass
+        self._username = username
+        self._userid = userid
+        self._api_type = api_type
+        self._client_api_url = client_api_url
+        self._client = None
+        if api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
+            self._client = async_get_client(hass, client_api_url)
+        self._data = {}
+        self._public_task = None
+        self._public_listener = None
+        self._last_refresh_public = None
+        self._next_refresh_public = 0
+        self._public_validators = {}
+        self.public_breaker = CircuitBreaker()
+        self._store = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.{slugify(str(userid or username or client_api_url))}",
+        )
+        self._last_refresh_client = {}
+        self._public_refresh_rate = PUBLIC_REFRESH_RATE
+        self._client_refresh_rate = CLIENT_REFRESH_RATE
+
+        # Only poll the client subtrees the configured sensors read from
+        if client_subtrees is None:
+            client_subtrees = CLIENT_ENDPOINTS.keys()
+        self._client_subtrees = [
+            subtree for subtree in CLIENT_ENDPOINTS if subtree in client_subtrees
+        ]
+        self._client_tier_rates = dict(CLIENT_TIER_REFRESH_RATES)
+        self._client_tier_rates["realtime"] = self._client_refresh_rate
+        self._adaptive_interval = None
+        self._pulse_aligned = False
+        self._align_public_to_pulses()
+
+        # Single-flight bookkeeping: one lock per source, plus a generation
+        # counter bumped after every attempt so waiters can share its result
+        self._locks = {"public": asyncio.Lock(), "client": asyncio.Lock()}
+        self._generations = {"public": 0, "client": 0}
+        self._request_counts = {"public": 0, "client": 0}
+
+    @property
+    def request_counts(self):
+        """Return the number of HTTP requests issued per source."""
+        return dict(self._request_counts)
+
+    @property
+    def update_interval(self):
+        """Return the time until the next refresh of any source being polled."""
+        rates = []
+        if self._api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
+            # Count down to the next public refresh, which a restored cache
+            # brings forward; one that is still due has failed, so retry it soon
+            remaining = self._next_refresh_public - datetime.now().timestamp()
+            rates.append(max(remaining, PUBLIC_RETRY_RATE))
+        if self._api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
+            rates.extend(self._client_tier_rates[subtree] for subtree in self._client_subtrees)
+        return timedelta(seconds=min(rates, default=self._public_refresh_rate))
+
+    async def async_load_cache(self):
+        """Restore the last payloads persisted before a restart."""
+        cache = await self._store.async_load()
+        if not cache:
+            return
+
+        public = cache.get("public")
+        if public and self._api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
+            self._data["public"] = public["data"]
+            self._last_refresh_public = public["fetched"]
+            self._public_validators = public.get("validators", {})
+            # The cache's age counts against the refresh schedule
+            self._next_refresh_public = public["fetched"] + self._public_refresh_rate
+
+        client = cache.get("client")
+        if client and self._api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
+            # Realtime rates are meaningless after a restart, and the local
+            # client is cheap to query, so it is refreshed right away
+            self._data["client"] = {
+                subtree: data
+                for subtree, data in client["data"].items()
+                if subtree != "realtime"
+            }
+
+    def _cache_data(self):
+        """Return the payloads to persist in the warm-start cache."""
+        cache = {}
+
+        if "public" in self._data:
+            cache["public"] = {
+                "data": self._data["public"],
+                "fetched": self._last_refresh_public,
+                "validators": self._public_validators,
+            }
+
+        if "client" in self._data:
+            cache["client"] = {
+                "data": self._data["client"],
+                "fetched": max(self._last_refresh_client.values(), default=None),
+            }
+
+        return cache
+
+    def notify_pulse(self):
+        """Schedule a public API refresh shortly after a pulse."""
+        pulse_refresh = datetime.now().timestamp() + PULSE_PUBLIC_REFRESH_DELAY
+        if pulse_refresh < self._next_refresh_public:
+            _LOGGER.debug("Pulse observed, refreshing public API data in %s seconds", PULSE_PUBLIC_REFRESH_DELAY)
+            self._next_refresh_public = pulse_refresh
+
+    def _align_public_to_pulses(self):
+        """Refresh the public API after pulses once unpulsed stats are polled.
+
+        With unpulsed stats available a pulse can be observed directly, so
+        the public API only needs refreshing after one (plus a safety net).
+        """
+        if self._pulse_aligned or not self._client or self._api_type != API_TYPE_BOTH:
+            return
+        if "unpulsed" not in self._client_subtrees:
+            return
+
+        self._pulse_aligned = True
+        self._public_refresh_rate = PULSE_SAFETY_REFRESH_RATE
+        self._client.add_pulse_listener(self.notify_pulse)
+
+    def set_tier_refresh_rate(self, subtree, rate):
+        """Poll a client subtree at a different rate, adding it if needed."""
+        if subtree not in self._client_subtrees:
+            self._client_subtrees = [
+                candidate for candidate in CLIENT_ENDPOINTS
+                if candidate in self._client_subtrees or candidate == subtree
+            ]
+            self._align_public_to_pulses()
+        self._client_tier_rates[subtree] = rate
+
+    def set_streamed_subtree(self, subtree):
+        """Stop polling a client subtree that is delivered by a stream instead."""
+        self._client_subtrees = [candidate for candidate in self._client_subtrees if candidate != subtree]
+
+    def set_client_subtree(self, subtree, data, fetched):
+        """Store a client subtree delivered outside the polling schedule."""
+        self._data.setdefault("client", {})[subtree] = data
+        self._last_refresh_client[subtree] = fetched
+
+    def set_adaptive_polling(self, min_interval, max_interval):
+        """Adapt the realtime refresh rate to user activity between the given bounds."""
+        self._adaptive_interval = (min_interval, max_interval)
+
+    def _adapt_client_refresh_rate(self, reachable):
+        """Shorten the realtime refresh rate while active, back off while idle."""
+        min_interval, max_interval = self._adaptive_interval
+        realtime = self._data.get("client", {}).get("realtime") or {}
+
+        active = False
+        if reachable:
+            for key in ("keys", "clicks"):
+                try:
+                    active = active or float(realtime.get(key) or 0) > 0
+                except (TypeError, ValueError):
+                    continue
+
+        if active:
+            rate = min_interval
+        else:
+            rate = min(self._client_tier_rates["realtime"] * ADAPTIVE_BACKOFF_FACTOR, max_interval)
+
+        self._client_tier_rates["realtime"] = max(min_interval, rate)
+
+    @property
+    def fetched(self):
+        """Return when the public payload and each client subtree were fetched."""
+        fetched = dict(self._last_refresh_client)
+        fetched["public"] = self._last_refresh_public
+        return fetched
+
+    def set_public_listener(self, listener):
+        """Register a callback invoked when a background public refresh finishes."""
+        self._public_listener = listener
+
+    async def async_update(self):
+        """Update the WhatPulse data."""
+        # Update public API data if needed. Alongside the client API it runs
+        # in the background, so a slow api.whatpulse.org never holds back the
+        # local client data.
+        if self._api_type == API_TYPE_PUBLIC:
+            await self._async_refresh_source("public")
+        elif self._api_type == API_TYPE_BOTH and self._public_due() and not self._public_task:
+            self._public_task = self._hass.async_create_background_task(
+                self._async_refresh_public_in_background(),
+                f"{DOMAIN} public refresh",
+            )
+
+        # Update client API data if needed
+        if self._api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
+            await self._async_refresh_source("client")
+
+        return dict(self._data)
+
+    def _public_due(self):
+        """Return True if the public API should be refreshed."""
+        return datetime.now().timestamp() >= self._next_refresh_public
+
+    async def _async_refresh_public_in_background(self):
+        """Refresh the public API and hand the result to the listener."""
+        try:
+            await self._async_refresh_source("public")
+        finally:
+            self._public_task = None
+
+        if self._public_listener:
+            self._public_listener()
+
+    async def _async_refresh_source(self, source):
+        """Refresh one source, coalescing concurrent callers into one request."""
+        generation = self._generations[source]
+
+        async with self._locks[source]:
+            # Another caller finished a request while we were waiting for
+            # the lock, so share its outcome instead of issuing our own
+            if self._generations[source] != generation:
+                return
+
+            current_time = datetime.now().timestamp()
+
+            if source == "public":
+                if self._public_due():
+                    self._request_counts[source] += 1
+                    if await self._async_update_public_data():
+                        self._last_refresh_public = current_time
+                        self._next_refresh_public = current_time + self._public_refresh_rate
+                        self._store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY)
+                    self._generations[source] += 1
+            else:
+                due = [
+                    subtree
+                    for subtree in self._client_subtrees
+                    if current_time >= self._last_refresh_client.get(subtree, 0) + self._client_tier_rates[subtree]
+                ]
+                if due:
+                    fetched = await self._async_update_client_data(due)
+                    for subtree in fetched:
+                        self._last_refresh_client[subtree] = current_time
+                    if fetched:
+                        self._store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY)
+
+                    if self._adaptive_interval and "realtime" in due:
+                        self._adapt_client_refresh_rate("realtime" in fetched)
+
+                        # Retry unreachable subtrees at the backed-off cadence
+                        # instead of on every coordinator tick
+                        for subtree in set(due) - set(fetched):
+                            self._last_refresh_client[subtree] = (
+                                current_time
+                                - self._client_tier_rates[subtree]
+                                + self._client_tier_rates["realtime"]
+                            )
+
+                    self._generations[source] += 1
+
+    async def _async_update_public_data(self):
+        """Get the latest data from WhatPulse public API."""
+        data = await self._request_update_public()
+        if data:
+            self._data["public"] = data
+            return True
+        return False
+
+    async def _async_update_client_data(self, subtrees):
+        """Get the latest data for the given subtrees from WhatPulse client API."""
+        if len(subtrees) == len(CLIENT_ENDPOINTS):
+            # Everything is due at once, so a single all-stats call is cheaper
+            self._request_counts["client"] += 1
+            data = await self._request_update_client()
+            fetched = {subtree: data[subtree] for subtree in subtrees if data and subtree in data}
+        else:
+            self._request_counts["client"] += len(subtrees)
+            results = await asyncio.gather(
+                *(self._request_update_client_subtree(subtree) for subtree in subtrees)
+            )
+            fetched = {subtree: data for subtree, data in zip(subtrees, results) if data}
+
+        if fetched:
+            client_data = dict(self._data.get("client", {}))
+
+            # Unpulsed counters dropping back means the client just pulsed
+            if self._is_pulse(client_data.get("unpulsed"), fetched.get("unpulsed")):
+                self._client.notify_pulse()
+
+            client_data.update(fetched)
+            self._data["client"] = client_data
+
+        return list(fetched)
+
+    @staticmethod
+    def _is_pulse(previous, current):
+        """Return True if the unpulsed counters were reset between two samples."""
+        if not previous or not current:
+            return False
+
+        for key in ("keys", "clicks", "scrolls", "download", "upload"):
+            try:
+                if float(current[key]) < float(previous[key]):
+                    return True
+            except (KeyError, TypeError, ValueError):
+                continue
+        return False
+
+    def _public_user_query(self):
+        """Return the query string identifying the user (userid preferred)."""
+        if self._userid:
+            return f"userid={self._userid}"
+        elif self._username:
+            return f"user={self._username}"
+        return None
+
+    async def _async_public_get(self, url, headers=None, priority=None):
+        """GET a public API URL through the public breaker and rate limiter.
+
+        By default the least recently refreshed user goes first.
+        """
+        if priority is None:
+            priority = self._last_refresh_public or 0
+        return await _async_public_get(self._hass, self.public_breaker, url, headers, priority)
+
+    async def _request_update_public(self):
+        """Request update from public WhatPulse API."""
+        # Build the URL based on what we have (userid preferred)
+        user_query = self._public_user_query()
+        if not user_query:
+            _LOGGER.error("No username or userid provided for WhatPulse public API")
+            return False
+
+        url = f"{PUBLIC_API_URL}{user_query}&format=json"
+
+        # Revalidate the cached payload so an unchanged one is not downloaded
+        headers = {}
+        if "public" in self._data:
+            if "etag" in self._public_validators:
+                headers["If-None-Match"] = self._public_validators["etag"]
+            if "last_modified" in self._public_validators:
+                headers["If-Modified-Since"] = self._public_validators["last_modified"]
+
+        result = await self._async_public_get(url, headers)
+        if result is None:
+            return False
+
+        status, data, response_headers = result
+        if status == 304:
+            return self._data["public"]
+
+        self._public_validators = {}
+        if "ETag" in response_headers:
+            self._public_validators["etag"] = response_headers["ETag"]
+        if "Last-Modified" in response_headers:
+            self._public_validators["last_modified"] = response_headers["Last-Modified"]
+
+        return data
+
+    async def async_request_pulses(self, start, end):
+        """Request the user's pulses between two unix timestamps.
+
+        Returns a list of pulse dicts (possibly empty), or None on failure.
+        """
+        user_query = self._public_user_query()
+        if not user_query:
+            return None
+
+        url = f"{PUBLIC_PULSES_API_URL}{user_query}&format=json&start={int(start)}&end={int(end)}"
+
+        result = await self._async_public_get(url, priority=PUBLIC_PRIORITY_BACKGROUND)
+        if result is None:
+            return None
+
+        _, data, _ = result
+
+        # Pulses come keyed by pulse id; an empty range may yield an error dict
+        if isinstance(data, dict):
+            if "error" in data:
+                return []
+            data = data.values()
+        return [pulse for pulse in data or [] if isinstance(pulse, dict)]
+
+    async def _request_update_client(self):
+        """Request update from WhatPulse client API."""
+        return await self._client.async_get(CLIENT_ALL_STATS_ENDPOINT)
+
+    async def _request_update_client_subtree(self, subtree):
+        """Request a single subtree from its narrow WhatPulse client API endpoint."""
+        data = await self._client.async_get(CLIENT_ENDPOINTS[subtree])
+
+        # Some client versions wrap the subtree in its own key
+        if isinstance(data, dict) and subtree in data:
+            return data[subtree]
+        return data
+
+
+class WhatPulseTeamAPI:
+    """Fetch a whole WhatPulse team, members included, in a single request."""
+
+    def __init__(self, hass, team):
+        """Initialize the team API."""
+        self._hass = hass
+        self.team = team
+        self.public_breaker = CircuitBreaker()
+        self._last_fetch = None
+
+    async def async_request_members(self):
+        """Request the team's members.
+
+        Returns {user id: member dict}, or None on failure.
+        """
+        url = f"{PUBLIC_TEAM_API_URL}team={quote(self.team)}&members=yes&format=json"
+
+        result = await _async_public_get(self._hass, self.public_breaker, url, priority=self._last_fetch or 0)
+        if result is None:
+            return None
+        self._last_fetch = datetime.now().timestamp()
+
+        _, data, _ = result
+        if not isinstance(data, dict) or "error" in data:
+            _LOGGER.error(f"Unable to fetch WhatPulse team {self.team}: {data}")
+            return None
+
+        # Members may be keyed or listed, directly or inside the team block
+        team_data = data.get("Team", data)
+        members = team_data.get("Members") or {}
+        if isinstance(members, dict):
+            members = members.values()
+
+        return {
+            str(member.get("UserID") or member.get("Username")): member
+            for member in members
+            if isinstance(member, dict) and (member.get("UserID") or member.get("Username"))
+        }
@@ -0,0 +1,150 @@
+"""Backfill of WhatPulse pulse history into long-term statistics."""
+
+import asyncio
+from datetime import datetime
+import logging
+
+from homeassistant.components.recorder.models import StatisticData
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import (
+    BACKFILL_PAGE_DELAY,
+    BACKFILL_PAGE_SECONDS,
+    BACKFILL_PULSE_FIELDS,
+    DOMAIN,
+    SENSOR_TYPES,
+    STORAGE_VERSION,
+)
+from .statistics import WhatPulseStatisticsImporter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WhatPulseBackfill:
+    """Page through a user's pulse history and import it as hourly statistics.
+
+    The history is paged backwards from the last pulse, starting from the
+    current lifetime totals and subtracting every pulse, so the imported
+    sums are lifetime totals. They join up with the statistics imported by
+    import_statistics, which share the same ids.
+
+    Every page covers a fixed time range and is aggregated and imported on
+    its own, so only one page of pulses is held in memory at a time. After
+    each page the remaining totals and the next page's end are saved, so an
+    interrupted backfill resumes where it stopped.
+    """
+
+    def __init__(self, hass, api, user):
+        """Initialize the backfill for one user."""
+        self._api = api
+        self._user = user
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.backfill.{slugify(user)}")
+        self._counters = list(BACKFILL_PULSE_FIELDS) + ["Pulses"]
+        self._importer = WhatPulseStatisticsImporter(hass, user, self._counters, SENSOR_TYPES)
+
+    async def async_run(self, start=None, restart=False):
+        """Import all pulses from the last pulse back to the checkpoint (or start)."""
+        checkpoint = None if restart else await self._store.async_load()
+
+        if checkpoint:
+            start = checkpoint["start"]
+            next_end = checkpoint["next_end"]
+            totals = checkpoint["totals"]
+        else:
+            start = start or self._date_joined()
+            next_end, totals = self._lifetime_totals()
+
+        if start is None:
+            raise HomeAssistantError(
+                f"Unknown join date for WhatPulse user {self._user}, provide a start date"
+            )
+
+        if totals is None:
+            raise HomeAssistantError(
+                f"Unknown lifetime totals for WhatPulse user {self._user}, try again after the next refresh"
+            )
+
+        _LOGGER.info(f"Backfilling WhatPulse history for {self._user} back to {dt_util.utc_from_timestamp(start)}")
+
+        while next_end > start:
+            # Pages start on whole hours, so no hour is split between two
+            # pages and imported twice with different totals
+            page_start = max((next_end - BACKFILL_PAGE_SECONDS) // 3600 * 3600, start)
+
+            pulses = await self._api.async_request_pulses(page_start, next_end)
+            if pulses is None:
+                raise HomeAssistantError(
+                    f"Fetching WhatPulse pulses for {self._user} failed, call the service again to resume"
+                )
+
+            self._import_page(pulses, totals)
+
+            next_end = page_start
+            await self._store.async_save({"start": start, "next_end": next_end, "totals": totals})
+
+            await asyncio.sleep(BACKFILL_PAGE_DELAY)
+
+        _LOGGER.info(f"Finished backfilling WhatPulse history for {self._user}")
+
+    def _date_joined(self):
+        """Return the user's join date from the public payload, if known."""
+        public_data = self._api._data.get("public") or {}
+        try:
+            return float(public_data["DateJoinedUnixTimestamp"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _lifetime_totals(self):
+        """Return the end of the last pulse and the lifetime totals up to it.
+
+        The totals are None if the public payload does not hold them all.
+        """
+        public_data = self._api._data.get("public") or {}
+        try:
+            end = float(public_data["LastPulseUnixTimestamp"]) + 1
+        except (KeyError, TypeError, ValueError):
+            end = datetime.now().timestamp()
+
+        try:
+            totals = {counter: float(public_data[counter]) for counter in self._counters}
+        except (KeyError, TypeError, ValueError):
+            return end, None
+        return end, totals
+
+    def _import_page(self, pulses, totals):
+        """Aggregate one page of pulses per hour and import the lifetime totals.
+
+        The totals hold the lifetime totals at the end of the page and are
+        left at those at its start.
+        """
+        hourly = {}
+        for pulse in pulses:
+            try:
+                timestamp = float(pulse["Timestamp"])
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            hour = dt_util.utc_from_timestamp(timestamp).replace(minute=0, second=0, microsecond=0)
+            increments = hourly.setdefault(hour, dict.fromkeys(self._counters, 0.0))
+            increments["Pulses"] += 1
+            for counter, field in BACKFILL_PULSE_FIELDS.items():
+                try:
+                    increments[counter] += float(pulse.get(field) or 0)
+                except (TypeError, ValueError):
+                    continue
+
+        # Walk back from the newest hour: the total at the end of an hour
+        # minus what was pulsed during it is the total at the end of the one before
+        rows = {counter: [] for counter in self._counters}
+        for hour in sorted(hourly, reverse=True):
+            for counter in self._counters:
+                rows[counter].append(
+                    StatisticData(start=hour, state=totals[counter], sum=totals[counter])
+                )
+                totals[counter] -= hourly[hour][counter]
+
+        for counter, statistics in rows.items():
+            if statistics:
+                self._importer.async_import_hourly(counter, statistics[::-1])
@@ -0,0 +1,85 @@
+"""Binary sensors for WhatPulse threshold rules."""
+import logging
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DATA_RULES, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the binary sensors of the rules discovered by the sensor platform."""
+    if discovery_info is None:
+        return
+
+    async_add_entities(
+        [
+            WhatPulseRuleBinarySensor(coordinator, rule, client_host)
+            for coordinator, client_host in hass.data[DOMAIN][DATA_RULES][discovery_info[DATA_RULES]]
+            for rule in coordinator.rules.rules
+        ]
+    )
+
+
+class WhatPulseRuleBinarySensor(CoordinatorEntity, BinarySensorEntity):
+    """A threshold rule evaluated by the coordinator on every sample."""
+
+    def __init__(self, coordinator, rule, client_host=None):
+        """Initialize the rule binary sensor."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._rule = rule
+        self._client_host = client_host
+        self._written_state = None
+        self._written_available = None
+
+    @property
+    def name(self):
+        """Return the name of the binary sensor."""
+        if self._client_host:
+            return f"WhatPulse {self._client_host} {self._rule.name}"
+        return f"WhatPulse {self._rule.name}"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        if self._client_host:
+            return f"whatpulse_client_{self._client_host}_rule_{self._rule.key}"
+        elif self._api._userid or self._api._username:
+            return f"whatpulse_{self._api._userid or self._api._username}_rule_{self._rule.key}"
+        else:
+            return f"whatpulse_client_rule_{self._rule.key}"
+
+    @property
+    def is_on(self):
+        """Return True if the rule holds."""
+        return self._rule.state
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return "mdi:gauge" if self._rule.state else "mdi:gauge-empty"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the rule and the value that triggered the last transition."""
+        return {
+            "sensor": self._rule.sensor_type,
+            "above": self._rule.above,
+            "below": self._rule.below,
+            "hysteresis": self._rule.hysteresis,
+            "value": self._rule.last_value,
+        }
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only when the rule or availability changed."""
+        available = self.available
+        if available == self._written_available and self._rule.state == self._written_state:
+            return
+
+        self._written_available = available
+        self._written_state = self._rule.state
+        self.async_write_ha_state()
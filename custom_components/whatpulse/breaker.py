@@ -0,0 +1,104 @@
+"""Circuit breaker for WhatPulse endpoints."""
+
+from time import monotonic
+
+from .const import (
+    BREAKER_BASE_BACKOFF,
+    BREAKER_CLOSED,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_HALF_OPEN,
+    BREAKER_MAX_BACKOFF,
+    BREAKER_OPEN,
+)
+
+
+class CircuitBreaker:
+    """Track the health of an endpoint and fail fast while it is down.
+
+    After a number of consecutive failures the breaker opens and rejects
+    every request. Once the backoff has passed it goes half-open and lets a
+    single probe through: a successful probe closes it again, a failed one
+    reopens it with a doubled backoff.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, base_backoff=BREAKER_BASE_BACKOFF, max_backoff=BREAKER_MAX_BACKOFF):
+        """Initialize the breaker in the closed state."""
+        self._failure_threshold = failure_threshold
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0
+        self._probing = False
+        self._state = BREAKER_CLOSED
+        self._state_since = monotonic()
+        self._durations = {BREAKER_CLOSED: 0, BREAKER_OPEN: 0, BREAKER_HALF_OPEN: 0}
+
+    @property
+    def state(self):
+        """Return the current state."""
+        return self._state
+
+    @property
+    def consecutive_failures(self):
+        """Return the number of failures since the last success."""
+        return self._failures
+
+    @property
+    def retry_in(self):
+        """Return the seconds until the next probe is allowed, if open."""
+        if self._state != BREAKER_OPEN:
+            return 0
+        return max(0, round(self._open_until - monotonic()))
+
+    def _set_state(self, state):
+        """Move to a new state, accounting the time spent in the old one."""
+        now = monotonic()
+        self._durations[self._state] += now - self._state_since
+        self._state = state
+        self._state_since = now
+
+    def allow_request(self):
+        """Return True if a request may be sent right now."""
+        if self._state == BREAKER_OPEN:
+            if monotonic() < self._open_until:
+                return False
+            self._set_state(BREAKER_HALF_OPEN)
+
+        if self._state == BREAKER_HALF_OPEN:
+            # Only one probe at a time while the endpoint is suspect
+            if self._probing:
+                return False
+            self._probing = True
+
+        return True
+
+    def release(self):
+        """Give up a granted request without an outcome (e.g. cancelled)."""
+        self._probing = False
+
+    def record_success(self):
+        """Record a request that reached the endpoint."""
+        self._failures = 0
+        self._trips = 0
+        self._probing = False
+        if self._state != BREAKER_CLOSED:
+            self._set_state(BREAKER_CLOSED)
+
+    def record_failure(self):
+        """Record a request that could not reach the endpoint."""
+        self._failures += 1
+        self._probing = False
+
+        if self._state == BREAKER_HALF_OPEN or self._failures >= self._failure_threshold:
+            backoff = min(self._base_backoff * 2 ** self._trips, self._max_backoff)
+            self._trips += 1
+            self._open_until = monotonic() + backoff
+            if self._state != BREAKER_OPEN:
+                self._set_state(BREAKER_OPEN)
+
+    def state_durations(self):
+        """Return the total seconds spent in each state."""
+        durations = dict(self._durations)
+        durations[self._state] += monotonic() - self._state_since
+        return {state: round(seconds) for state, seconds in durations.items()}
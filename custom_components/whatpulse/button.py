@@ -2,11 +2,11 @@
 import logging
 
 import voluptuous as vol
-import requests
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.const import CONF_NAME
 
+from .api import async_get_client
 from .const import (
     DOMAIN,
     CONF_CLIENT_API_URL,
@@ -14,6 +14,7 @@ from .const import (
     CONF_API_TYPE,
     API_TYPE_CLIENT,
     API_TYPE_BOTH,
+    CLIENT_PULSE_ENDPOINT,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,17 +36,19 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
 
     _LOGGER.info(f"Setting up WhatPulse buttons with client API URL: {client_api_url}")
 
+    client = async_get_client(hass, client_api_url)
+
     buttons = [
         WhatPulseButton(
-            client_api_url,
+            client,
             "pulse",
             "Pulse",
             "mdi:pulse",
             "Trigger a manual pulse",
-            "/v1/pulse"
+            CLIENT_PULSE_ENDPOINT
         ),
         WhatPulseButton(
-            client_api_url,
+            client,
             "open_window",
             "Open Client",
             "mdi:window-maximize",
@@ -60,9 +63,9 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
 class WhatPulseButton(ButtonEntity):
     """Representation of a WhatPulse button."""
 
-    def __init__(self, client_api_url, action_id, name, icon, description, endpoint):
+    def __init__(self, client, action_id, name, icon, description, endpoint):
         """Initialize the button."""
-        self._client_api_url = client_api_url
+        self._client = client
         self._action_id = action_id
         self._name = name
         self._icon = icon
@@ -92,23 +95,14 @@ class WhatPulseButton(ButtonEntity):
 
     async def async_press(self):
         """Press the button."""
-        await self.hass.async_add_executor_job(self._perform_action)
+        await self._async_perform_action()
 
-    def _perform_action(self):
+    async def _async_perform_action(self):
         """Perform the button action."""
-        url = f"{self._client_api_url}{self._endpoint}"
-
-        try:
-            # Send empty POST request to the endpoint
-            response = requests.post(url, timeout=10)
-
-            if response.status_code != 200:
-                _LOGGER.error(f"Failed to {self._action_id}: {response.status_code}, {response.text}")
-                return False
-
-            _LOGGER.info(f"Successfully performed action: {self._action_id}")
-            return True
+        # Send empty POST request to the endpoint
+        if not await self._client.async_post(self._endpoint):
+            _LOGGER.error(f"Failed to {self._action_id}")
+            return False
 
-        except Exception as ex:
-            _LOGGER.error(f"Error performing {self._action_id} action: {ex}")
-            return False
\ No newline at end of file
+        _LOGGER.info(f"Successfully performed action: {self._action_id}")
+        return True
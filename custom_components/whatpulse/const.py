@@ -4,20 +4,235 @@ from datetime import timedelta
 
 # API URLs
 PUBLIC_API_URL = "https://api.whatpulse.org/user.php?"
+PUBLIC_PULSES_API_URL = "https://api.whatpulse.org/pulses.php?"
+PUBLIC_TEAM_API_URL = "https://api.whatpulse.org/team.php?"
 DEFAULT_CLIENT_API_URL = "http://localhost:3490"  # Default client API URL
 
 # Refresh rates
 PUBLIC_REFRESH_RATE = 3600  # 60 minutes for public API
 CLIENT_REFRESH_RATE = 30   # 30 seconds for client API
+PUBLIC_RETRY_RATE = 30  # 30 seconds before retrying a failed public API request
 MIN_TIME_BETWEEN_UPDATES_PUBLIC = timedelta(seconds=PUBLIC_REFRESH_RATE)
 MIN_TIME_BETWEEN_UPDATES_CLIENT = timedelta(seconds=CLIENT_REFRESH_RATE)
 
+# When the client API is also polled, the public API is refreshed shortly after
+# an observed pulse, with a long safety-net interval in between
+PULSE_PUBLIC_REFRESH_DELAY = 60
+PULSE_SAFETY_REFRESH_RATE = 6 * 3600
+
+# Client API subtrees, the narrow endpoint serving each and its refresh rate.
+# Realtime stats change every second, unpulsed stats slowly, and the account
+# totals (including ranks) only when a pulse is sent.
+CLIENT_ALL_STATS_ENDPOINT = "/v1/all-stats"
+CLIENT_PULSE_ENDPOINT = "/v1/pulse"
+CLIENT_ENDPOINTS = {
+    "realtime": "/v1/realtime",
+    "unpulsed": "/v1/unpulsed",
+    "account-totals": "/v1/account-totals",
+}
+CLIENT_TIER_REFRESH_RATES = {
+    "realtime": CLIENT_REFRESH_RATE,
+    "unpulsed": 60,
+    "account-totals": 300,
+}
+
+# Adaptive client polling: the realtime interval drops to the floor while the
+# user is active and grows by the backoff factor while idle or unreachable
+DEFAULT_ADAPTIVE_MIN_INTERVAL = 5
+DEFAULT_ADAPTIVE_MAX_INTERVAL = 300
+ADAPTIVE_BACKOFF_FACTOR = 2
+
+# Fleet mode: at most this many clients are polled at once, and each host's
+# polls are offset by a stable random delay of up to the jitter in seconds
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_FLEET_JITTER = 5
+
+# Locally derived rates: rolling windows (label -> seconds), the size of the
+# sample ring buffer and the counters sampled. Rates are scaled to "per" seconds;
+# account totals are scaled by "totals_scale" to match the unpulsed unit.
+RATE_WINDOWS = {"1m": 60, "15m": 900, "1h": 3600}
+RATE_BUFFER_SIZE = 512
+RATE_CHANNELS = {
+    "keys": {"sensor": "Keys", "name": "Keys Per Minute", "icon": "mdi:keyboard", "unit": "keys/min", "per": 60, "unpulsed": "keys", "totals": "keys", "totals_scale": 1},
+    "clicks": {"sensor": "Clicks", "name": "Clicks Per Minute", "icon": "mdi:mouse", "unit": "clicks/min", "per": 60, "unpulsed": "clicks", "totals": "clicks", "totals_scale": 1},
+    "scrolls": {"sensor": "Scrolls", "name": "Scrolls Per Minute", "icon": "mdi:mouse-scroll-wheel", "unit": "scrolls/min", "per": 60, "unpulsed": "scrolls", "totals": "scrolls", "totals_scale": 1},
+    "download": {"sensor": "Download", "name": "Download Rate", "icon": "mdi:download", "unit": "B/s", "per": 1, "unpulsed": "download", "totals": "download", "totals_scale": 1024 * 1024},
+    "upload": {"sensor": "Upload", "name": "Upload Rate", "icon": "mdi:upload", "unit": "B/s", "per": 1, "unpulsed": "upload", "totals": "upload", "totals_scale": 1024 * 1024},
+}
+
+# Formatted values ("1.23TB", "12KB/s", "3d4h") are parsed into numbers by the
+# sensor type's "parse" entry: "size" (MB), "rate" (kB/s) or "duration" (s).
+# Existing entities' units are migrated once, recorded under this key.
+NORMALIZATION_MIGRATION = "normalized_units"
+
+# Realtime streaming samples the realtime endpoint every poll interval (in
+# seconds) and publishes the latest sample at most max rate times a second
+DEFAULT_STREAM_POLL_INTERVAL = 0.25
+DEFAULT_STREAM_MAX_RATE = 2
+
+# Team mode fetches all members in one request; these counters are reported
+# per member, and the leaderboard ranks members by one of them
+CONF_TEAM = "team"
+CONF_TEAM_RANK_BY = "rank_by"
+TEAM_MEMBER_SENSORS = ["Keys", "Clicks", "Scrolls", "DownloadMB", "UploadMB", "UptimeSeconds", "DistanceInMiles"]
+DEFAULT_TEAM_RANK_BY = "Keys"
+
+# Lifetime totals that are kept live in "both" mode, by adding the client's
+# unpulsed counter (channel) to the last pulsed total
+LIVE_TOTALS = {"Keys": "keys", "Clicks": "clicks", "Scrolls": "scrolls"}
+
+# Bulk import of hourly long-term statistics for lifetime counters
+CONF_IMPORT_STATISTICS = "import_statistics"
+
+# History backfill: pulses are fetched in pages of this many seconds, with a
+# delay between pages to stay well within the public API's rate limits.
+# Each pulse field is summed into the statistic of the matching counter.
+BACKFILL_PAGE_SECONDS = 30 * 86400
+BACKFILL_PAGE_DELAY = 2
+BACKFILL_PULSE_FIELDS = {
+    "Keys": "Keys",
+    "Clicks": "Clicks",
+    "Scrolls": "Scrolls",
+    "DownloadMB": "DownloadMB",
+    "UploadMB": "UploadMB",
+    "UptimeSeconds": "UptimeSeconds",
+    "DistanceInMiles": "DistanceInMiles",
+}
+SERVICE_BACKFILL_HISTORY = "backfill_history"
+DATA_APIS = "apis"
+
+# All public API requests share one token bucket: a steady rate in requests
+# per second with a small burst. Backfill pages queue behind regular
+# refreshes. Without a usable Retry-After, a 429 pauses for the default.
+PUBLIC_RATE_LIMIT_RATE = 0.5
+PUBLIC_RATE_LIMIT_BURST = 3
+PUBLIC_RETRY_AFTER_DEFAULT = 60
+PUBLIC_PRIORITY_BACKGROUND = float("inf")
+DATA_PUBLIC_SCHEDULER = "public_scheduler"
+
+# Threshold rules are evaluated against every sample and exposed as binary
+# sensors. Each reads one sensor type, which is polled even if not monitored.
+CONF_RULES = "rules"
+CONF_RULE_SENSOR = "sensor"
+CONF_ABOVE = "above"
+CONF_BELOW = "below"
+CONF_HYSTERESIS = "hysteresis"
+CONF_DELAY_ON = "delay_on"
+CONF_DELAY_OFF = "delay_off"
+DATA_RULES = "rules"
+DATA_HASS_CONFIG = "hass_config"
+
+# The latest snapshots can be scraped in OpenMetrics format. Public fields and
+# client subtree fields map to (metric family, type, help, parser).
+CONF_OPENMETRICS = "openmetrics"
+DATA_OPENMETRICS = "openmetrics"
+OPENMETRICS_URL = "/api/whatpulse/metrics"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+OPENMETRICS_PUBLIC = {
+    "Keys": ("whatpulse_keys", "counter", "Lifetime keys", None),
+    "Clicks": ("whatpulse_clicks", "counter", "Lifetime clicks", None),
+    "Scrolls": ("whatpulse_scrolls", "counter", "Lifetime scrolls", None),
+    "DownloadMB": ("whatpulse_download_megabytes", "counter", "Lifetime download in MB", None),
+    "UploadMB": ("whatpulse_upload_megabytes", "counter", "Lifetime upload in MB", None),
+    "UptimeSeconds": ("whatpulse_uptime_seconds", "counter", "Lifetime uptime", None),
+    "DistanceInMiles": ("whatpulse_distance_miles", "counter", "Lifetime mouse distance in miles", None),
+    "Pulses": ("whatpulse_pulses", "counter", "Lifetime pulses", None),
+    "LastPulseUnixTimestamp": ("whatpulse_last_pulse_timestamp_seconds", "gauge", "Time of the last pulse", None),
+}
+OPENMETRICS_CLIENT = {
+    "realtime": {
+        "keys": ("whatpulse_realtime_keys_per_second", "gauge", "Keys per second", None),
+        "clicks": ("whatpulse_realtime_clicks_per_second", "gauge", "Clicks per second", None),
+        "download": ("whatpulse_realtime_download_kilobytes_per_second", "gauge", "Download rate in kB/s", "rate"),
+        "upload": ("whatpulse_realtime_upload_kilobytes_per_second", "gauge", "Upload rate in kB/s", "rate"),
+    },
+    "unpulsed": {
+        "keys": ("whatpulse_unpulsed_keys", "gauge", "Keys since the last pulse", None),
+        "clicks": ("whatpulse_unpulsed_clicks", "gauge", "Clicks since the last pulse", None),
+        "scrolls": ("whatpulse_unpulsed_scrolls", "gauge", "Scrolls since the last pulse", None),
+        "download": ("whatpulse_unpulsed_download_bytes", "gauge", "Download since the last pulse", None),
+        "upload": ("whatpulse_unpulsed_upload_bytes", "gauge", "Upload since the last pulse", None),
+        "uptime": ("whatpulse_unpulsed_uptime_seconds", "gauge", "Uptime since the last pulse", None),
+    },
+    "account-totals": {
+        "keys": ("whatpulse_client_keys", "counter", "Account keys known to the client", None),
+        "clicks": ("whatpulse_client_clicks", "counter", "Account clicks known to the client", None),
+        "scrolls": ("whatpulse_client_scrolls", "counter", "Account scrolls known to the client", None),
+        "download": ("whatpulse_client_download_megabytes", "counter", "Account download in MB known to the client", None),
+        "upload": ("whatpulse_client_upload_megabytes", "counter", "Account upload in MB known to the client", None),
+        "uptime": ("whatpulse_client_uptime_seconds", "counter", "Account uptime known to the client", None),
+        "distance_miles": ("whatpulse_client_distance_miles", "counter", "Account mouse distance in miles known to the client", None),
+    },
+}
+
+# Events fired once per transition detected during an update: a pulse, a
+# counter crossing a multiple of its milestone step, or a changed rank
+EVENT_PULSE = "whatpulse_pulse"
+EVENT_MILESTONE = "whatpulse_milestone"
+EVENT_RANK_CHANGE = "whatpulse_rank_change"
+
+# Seconds of clock skew allowed when matching a public last pulse with a
+# pulse the client already reported
+PULSE_MATCH_TOLERANCE = 60
+MILESTONES = {
+    "Keys": 1_000_000,
+    "Clicks": 1_000_000,
+    "Scrolls": 100_000,
+    "Pulses": 1_000,
+    "DownloadMB": 1_048_576,
+    "UploadMB": 1_048_576,
+    "DistanceInMiles": 100,
+}
+
+# Request instrumentation keeps the last samples of every phase per endpoint
+METRICS_WINDOW = 200
+METRICS_PHASES = ["dns", "connect", "wait", "transfer", "decode", "total"]
+LATENCY_DEADBAND = 5  # Change in p95 latency (ms) before a latency sensor writes its state
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+SERVICE_DUMP_DIAGNOSTICS = "dump_diagnostics"
+
+# Warm-start cache of the last API payloads
+STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 30
+
+# HTTP request timeouts in seconds. Probes of an endpoint that is known to be
+# down use the short probe timeout so they fail fast.
+REQUEST_TIMEOUT = 10
+CONNECT_TIMEOUT = 3
+PROBE_TIMEOUT = 3
+
+# Circuit breaker: open after this many consecutive failures, then probe again
+# after a backoff that doubles on every failed probe
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_BASE_BACKOFF = 30
+BREAKER_MAX_BACKOFF = 900
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
 # Configuration constants
 DOMAIN = "whatpulse"
 CONF_USERID = "userid"
 CONF_API_TYPE = "api_type"
 CONF_SENSORS = "sensors"
 CONF_CLIENT_API_URL = "client_api_url"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_REALTIME_DEADBAND = "realtime_deadband"
+CONF_CLIENTS = "clients"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_FLEET_JITTER = "fleet_jitter"
+CONF_REALTIME_MIN_WRITE_INTERVAL = "realtime_min_write_interval"
+CONF_REALTIME_STREAMING = "realtime_streaming"
+CONF_STREAM_POLL_INTERVAL = "stream_poll_interval"
+CONF_STREAM_MAX_RATE = "stream_max_rate"
+
+# Keys in hass.data[DOMAIN]
+DATA_CLIENTS = "clients"
+DATA_COORDINATORS = "coordinators"
+DATA_SESSION = "session"
+DATA_METRICS = "metrics"
 
 # API types
 API_TYPE_PUBLIC = "public"
@@ -34,6 +249,7 @@ SENSOR_TYPES = {
         "unit": "keys",
         "rank_key": "Keys",
         "client_path": ["account-totals", "keys"],
+        "state_class": "total_increasing",
     },
     "Clicks": {
         "name": "Clicks",
@@ -41,6 +257,7 @@ SENSOR_TYPES = {
         "unit": "clicks",
         "rank_key": "Clicks",
         "client_path": ["account-totals", "clicks"],
+        "state_class": "total_increasing",
     },
     "Scrolls": {
         "name": "Scrolls",
@@ -48,13 +265,17 @@ SENSOR_TYPES = {
         "unit": "scrolls",
         "rank_key": "Scrolls",
         "client_path": ["account-totals", "scrolls"],
+        "state_class": "total_increasing",
     },
     "Download": {
         "name": "Download",
         "icon": "mdi:download",
-        "unit": "",
+        "unit": "MB",
         "rank_key": "Download",
         "client_path": None,
+        "parse": "size",
+        "device_class": "data_size",
+        "state_class": "total_increasing",
     },
     "DownloadMB": {
         "name": "Download",
@@ -62,13 +283,17 @@ SENSOR_TYPES = {
         "unit": "MB",
         "rank_key": "Download",
         "client_path": ["account-totals", "download"],
+        "state_class": "total_increasing",
     },
     "Upload": {
         "name": "Upload",
         "icon": "mdi:upload",
-        "unit": "",
+        "unit": "MB",
         "rank_key": "Upload",
         "client_path": None,
+        "parse": "size",
+        "device_class": "data_size",
+        "state_class": "total_increasing",
     },
     "UploadMB": {
         "name": "Upload",
@@ -76,6 +301,7 @@ SENSOR_TYPES = {
         "unit": "MB",
         "rank_key": "Upload",
         "client_path": ["account-totals", "upload"],
+        "state_class": "total_increasing",
     },
     "UptimeSeconds": {
         "name": "Uptime",
@@ -83,20 +309,27 @@ SENSOR_TYPES = {
         "unit": "seconds",
         "rank_key": "Uptime",
         "client_path": ["account-totals", "uptime"],
+        "state_class": "total_increasing",
     },
     "UptimeShort": {
         "name": "Uptime",
         "icon": "mdi:clock-outline",
-        "unit": "",
+        "unit": "s",
         "rank_key": "Uptime",
         "client_path": None,
+        "parse": "duration",
+        "device_class": "duration",
+        "state_class": "total_increasing",
     },
     "UptimeLong": {
         "name": "Uptime",
         "icon": "mdi:clock-outline",
-        "unit": "",
+        "unit": "s",
         "rank_key": "Uptime",
         "client_path": None,
+        "parse": "duration",
+        "device_class": "duration",
+        "state_class": "total_increasing",
     },
     "DistanceInMiles": {
         "name": "Distance",
@@ -104,6 +337,7 @@ SENSOR_TYPES = {
         "unit": "miles",
         "rank_key": "Distance",
         "client_path": ["account-totals", "distance_miles"],
+        "state_class": "total_increasing",
     },
     "Pulses": {
         "name": "Pulses",
@@ -111,6 +345,7 @@ SENSOR_TYPES = {
         "unit": "pulses",
         "rank_key": None,
         "client_path": None,
+        "state_class": "total_increasing",
     },
     "AvKeysPerPulse": {
         "name": "Average Keys Per Pulse",
@@ -118,6 +353,7 @@ SENSOR_TYPES = {
         "unit": "keys/pulse",
         "rank_key": None,
         "client_path": None,
+        "state_class": "measurement",
     },
     "AvClicksPerPulse": {
         "name": "Average Clicks Per Pulse",
@@ -125,6 +361,7 @@ SENSOR_TYPES = {
         "unit": "clicks/pulse",
         "rank_key": None,
         "client_path": None,
+        "state_class": "measurement",
     },
     "AvKPS": {
         "name": "Average Keys Per Second",
@@ -132,6 +369,7 @@ SENSOR_TYPES = {
         "unit": "keys/sec",
         "rank_key": None,
         "client_path": None,
+        "state_class": "measurement",
     },
     "AvCPS": {
         "name": "Average Clicks Per Second",
@@ -139,6 +377,7 @@ SENSOR_TYPES = {
         "unit": "clicks/sec",
         "rank_key": None,
         "client_path": None,
+        "state_class": "measurement",
     },
     # Add these new sensor types to the SENSOR_TYPES dictionary
   "RankKeys": {
@@ -204,6 +443,7 @@ SENSOR_TYPES = {
         "unit": "keys",
         "rank_key": None,
         "client_path": ["unpulsed", "keys"],
+        "state_class": "total_increasing",
     },
     "UnpulsedClicks": {
         "name": "Unpulsed Clicks",
@@ -211,6 +451,7 @@ SENSOR_TYPES = {
         "unit": "clicks",
         "rank_key": None,
         "client_path": ["unpulsed", "clicks"],
+        "state_class": "total_increasing",
     },
     "UnpulsedScrolls": {
         "name": "Unpulsed Scrolls",
@@ -218,6 +459,7 @@ SENSOR_TYPES = {
         "unit": "scrolls",
         "rank_key": None,
         "client_path": ["unpulsed", "scrolls"],
+        "state_class": "total_increasing",
     },
     "UnpulsedDownload": {
         "name": "Unpulsed Download",
@@ -225,6 +467,7 @@ SENSOR_TYPES = {
         "unit": "bytes",
         "rank_key": None,
         "client_path": ["unpulsed", "download"],
+        "state_class": "total_increasing",
     },
     "UnpulsedUpload": {
         "name": "Unpulsed Upload",
@@ -232,6 +475,7 @@ SENSOR_TYPES = {
         "unit": "bytes",
         "rank_key": None,
         "client_path": ["unpulsed", "upload"],
+        "state_class": "total_increasing",
     },
     "UnpulsedUptime": {
         "name": "Unpulsed Uptime",
@@ -239,6 +483,7 @@ SENSOR_TYPES = {
         "unit": "seconds",
         "rank_key": None,
         "client_path": ["unpulsed", "uptime"],
+        "state_class": "total_increasing",
     },
     "RealtimeKeys": {
         "name": "Realtime Keys",
@@ -246,6 +491,7 @@ SENSOR_TYPES = {
         "unit": "keys/s",
         "rank_key": None,
         "client_path": ["realtime", "keys"],
+        "state_class": "measurement",
     },
     "RealtimeClicks": {
         "name": "Realtime Clicks",
@@ -253,21 +499,41 @@ SENSOR_TYPES = {
         "unit": "clicks/s",
         "rank_key": None,
         "client_path": ["realtime", "clicks"],
+        "state_class": "measurement",
     },
     "RealtimeDownload": {
         "name": "Realtime Download",
         "icon": "mdi:download",
-        "unit": "",
+        "unit": "kB/s",
         "rank_key": None,
         "client_path": ["realtime", "download"],
+        "parse": "rate",
+        "device_class": "data_rate",
+        "state_class": "measurement",
     },
     "RealtimeUpload": {
         "name": "Realtime Upload",
         "icon": "mdi:upload",
-        "unit": "",
+        "unit": "kB/s",
         "rank_key": None,
         "client_path": ["realtime", "upload"],
+        "parse": "rate",
+        "device_class": "data_rate",
+        "state_class": "measurement",
     },
 }
 
+# Rolling rate sensors, e.g. KeysRate1m or DownloadRate1h
+for _channel, _info in RATE_CHANNELS.items():
+    for _window in RATE_WINDOWS:
+        SENSOR_TYPES[f"{_info['sensor']}Rate{_window}"] = {
+            "name": f"{_info['name']} ({_window})",
+            "icon": _info["icon"],
+            "unit": _info["unit"],
+            "rank_key": None,
+            "client_path": None,
+            "rate": (_channel, _window),
+            "state_class": "measurement",
+        }
+
 DEFAULT_SENSORS = ["Keys", "Clicks", "Download", "Upload", "UptimeShort", "RealtimeDownload", "RealtimeUpload"]
\ No newline at end of file
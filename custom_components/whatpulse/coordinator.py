@@ -0,0 +1,217 @@
+"""Data update coordinator for the WhatPulse integration."""
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import random
+from time import monotonic
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DOMAIN, PUBLIC_REFRESH_RATE, PUBLIC_RETRY_RATE
+from .events import WhatPulseEventDetector
+from .metrics import async_get_metrics
+from .parsing import as_float, normalize_values
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WhatPulseFleetScheduler:
+    """Share polling capacity between the coordinators of a fleet of clients."""
+
+    def __init__(self, max_concurrency, jitter):
+        """Initialize the scheduler."""
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._jitter = jitter
+
+    def offset(self, client_api_url):
+        """Return the stable delay applied to every poll of a client."""
+        return random.Random(client_api_url).uniform(0, self._jitter)
+
+    async def async_run(self, client_api_url, fetch):
+        """Run a fetch after the client's offset, within the concurrency cap."""
+        await asyncio.sleep(self.offset(client_api_url))
+
+        async with self._semaphore:
+            return await fetch()
+
+
+class WhatPulseCoordinator(DataUpdateCoordinator):
+    """Fetch WhatPulse data once per interval and fan it out to all entities."""
+
+    def __init__(self, hass, api, plan, scheduler=None, rates=None, statistics=None, totals=None, rules=None):
+        """Initialize the coordinator."""
+        # Tick at the fastest tier; the API skips sources that are not due
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=api.update_interval,
+        )
+        self.api = api
+        self.plan = plan
+        self.scheduler = scheduler
+        self.rates = rates
+        self.statistics = statistics
+        self.totals = totals
+        self.rules = rules
+        self.stream = None
+        self.events = WhatPulseEventDetector(hass, api._userid or api._username or api._client_api_url)
+        self._last_rate_sample = None
+        api.set_public_listener(self._async_public_updated)
+        self.values = {}
+        self.formatted = {}
+        self.profile = (None, {})
+
+    async def _async_update_data(self):
+        """Fetch data from the WhatPulse APIs."""
+        if self.scheduler:
+            data = await self.scheduler.async_run(self.api._client_api_url, self.api.async_update)
+        else:
+            data = await self.api.async_update()
+
+        # The API may have adapted its refresh rates to the latest sample
+        self.update_interval = self.api.update_interval
+
+        if not data:
+            raise UpdateFailed("No data received from WhatPulse")
+
+        # Feed the rate engine once per fresh client sample
+        sample_time = max(
+            (self.api.fetched.get(subtree) or 0 for subtree in ("unpulsed", "account-totals")),
+            default=0,
+        )
+        if self.rates and data.get("client") and sample_time and sample_time != self._last_rate_sample:
+            self._last_rate_sample = sample_time
+            self.rates.add_sample(sample_time, data["client"])
+
+        self._extract(data)
+
+        if self.statistics:
+            self.statistics.add_sample(datetime.now().timestamp(), self.values)
+
+        return data
+
+    @property
+    def entity_metrics_key(self):
+        """Return the metrics key of this coordinator's entity updates."""
+        return f"entities:{self.api._userid or self.api._username or self.api._client_api_url}"
+
+    @callback
+    def async_update_listeners(self):
+        """Update all entities, recording how long that took."""
+        start = monotonic()
+        super().async_update_listeners()
+        async_get_metrics(self.hass).endpoint(self.entity_metrics_key).record_success(
+            {"total": monotonic() - start}
+        )
+
+    def _extract(self, data):
+        """Resolve every sensor's value once, before the entities are notified."""
+        self.values = self.plan.extract(data, self.api.fetched)
+        self.formatted = normalize_values(self.values, self.plan.parsers)
+        if self.rates:
+            self.values.update(self.rates.values())
+        if self.totals:
+            self.values.update(self.totals.values(data))
+        self.profile = self.plan.extract_profile(data)
+        self.events.async_process(data, self.values)
+        if self.rules:
+            self.rules.evaluate(self.values, monotonic())
+
+    @callback
+    def async_set_client_subtree(self, subtree, data, fetched):
+        """Push a streamed client subtree to the entities.
+
+        Like a background public refresh, this leaves the polling schedule
+        untouched.
+        """
+        self.api.set_client_subtree(subtree, data, fetched)
+        self.data = dict(self.api._data)
+        self._extract(self.data)
+        self.async_update_listeners()
+
+    @callback
+    def _async_public_updated(self):
+        """Push a background public refresh to the entities.
+
+        The client polling schedule is left untouched, unlike with
+        async_set_updated_data.
+        """
+        self.data = dict(self.api._data)
+        self._extract(self.data)
+        self.async_update_listeners()
+
+
+class WhatPulseTeamCoordinator(DataUpdateCoordinator):
+    """Fetch a whole team at once and work out which members changed."""
+
+    def __init__(self, hass, api, sensor_types, rank_by):
+        """Initialize the team coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} team {api.team}",
+            update_interval=timedelta(seconds=PUBLIC_REFRESH_RATE),
+        )
+        self.api = api
+        self.sensor_types = sensor_types
+        self.rank_by = rank_by
+        self.members = {}
+        self.changed_members = set()
+        self.leaderboard = []
+        self.leaderboard_changed = False
+
+    async def _async_update_data(self):
+        """Fetch the team and diff every member against the last fetch."""
+        members = await self.api.async_request_members()
+        if members is None:
+            self.changed_members = set()
+            self.leaderboard_changed = False
+            # Retry soon instead of a whole refresh period later
+            self.update_interval = timedelta(seconds=PUBLIC_RETRY_RATE)
+            raise UpdateFailed(f"No data received for WhatPulse team {self.api.team}")
+
+        self.update_interval = timedelta(seconds=PUBLIC_REFRESH_RATE)
+
+        previous = self.members
+        self.members = {
+            member_id: {
+                "name": member.get("Username") or member_id,
+                "values": {
+                    sensor_type: _team_value(member.get(sensor_type))
+                    for sensor_type in self.sensor_types
+                },
+            }
+            for member_id, member in members.items()
+        }
+
+        # Entities of unchanged members skip their state write
+        self.changed_members = {
+            member_id
+            for member_id, member in self.members.items()
+            if previous.get(member_id) != member
+        }
+
+        leaderboard = sorted(
+            (
+                (member["values"].get(self.rank_by), member["name"], member_id)
+                for member_id, member in self.members.items()
+                if member["values"].get(self.rank_by) is not None
+            ),
+            key=lambda entry: entry[0],
+            reverse=True,
+        )
+        self.leaderboard_changed = leaderboard != self.leaderboard
+        self.leaderboard = leaderboard
+
+        return self.members
+
+
+def _team_value(value):
+    """Return a member counter as a number, integral where possible."""
+    value = as_float(value)
+    if value is not None and value.is_integer():
+        return int(value)
+    return value
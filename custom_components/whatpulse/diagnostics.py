@@ -0,0 +1,60 @@
+"""Diagnostics of the WhatPulse pollers."""
+
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DATA_COORDINATORS, DATA_METRICS, DATA_PUBLIC_SCHEDULER, DOMAIN
+
+TO_REDACT = {"userid", "username"}
+
+
+def _breaker_diagnostics(breaker):
+    """Return the state of a circuit breaker."""
+    return {
+        "state": breaker.state,
+        "consecutive_failures": breaker.consecutive_failures,
+        "retry_in": breaker.retry_in,
+        "seconds_in_state": breaker.state_durations(),
+    }
+
+
+def _coordinator_diagnostics(coordinator):
+    """Return the polling state of one coordinator."""
+    api = coordinator.api
+    diagnostics = {
+        "userid": api._userid,
+        "username": api._username,
+        "api_type": api._api_type,
+        "client_api_url": api._client_api_url,
+        "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+        "last_update_success": coordinator.last_update_success,
+        "request_counts": dict(api.request_counts),
+        "fetched": api.fetched,
+        "public_breaker": _breaker_diagnostics(api.public_breaker),
+    }
+
+    if api._client:
+        diagnostics["client_breaker"] = _breaker_diagnostics(api._client.breaker)
+
+    if coordinator.stream:
+        diagnostics["stream"] = {
+            "samples": coordinator.stream.samples,
+            "published": coordinator.stream.published,
+        }
+
+    return diagnostics
+
+
+def async_get_diagnostics(hass):
+    """Return the state and request metrics of every WhatPulse poller."""
+    data = hass.data.get(DOMAIN, {})
+    diagnostics = {
+        "coordinators": [
+            _coordinator_diagnostics(coordinator) for coordinator in data.get(DATA_COORDINATORS, [])
+        ],
+        "endpoints": data[DATA_METRICS].as_dict() if DATA_METRICS in data else {},
+    }
+
+    if DATA_PUBLIC_SCHEDULER in data:
+        diagnostics["public_scheduler"] = {"queued": data[DATA_PUBLIC_SCHEDULER].queued}
+
+    return async_redact_data(diagnostics, TO_REDACT)
@@ -0,0 +1,123 @@
+"""Detection of pulses, milestones and rank changes as event bus events."""
+
+from datetime import datetime
+import logging
+
+from .api import WhatPulseAPI
+from .const import EVENT_MILESTONE, EVENT_PULSE, EVENT_RANK_CHANGE, MILESTONES, PULSE_MATCH_TOLERANCE
+from .parsing import as_float
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WhatPulseEventDetector:
+    """Compare every snapshot with the previous one and fire typed events.
+
+    The first snapshot only sets the baseline. A pulse seen as an unpulsed
+    reset on the client happened between two samples; it is not fired again
+    when the public API catches up with a LastPulseUnixTimestamp in that
+    window. Public pulses outside it, such as those of other computers, are
+    fired.
+    """
+
+    def __init__(self, hass, user):
+        """Initialize the detector for one user or client."""
+        self._hass = hass
+        self._user = user
+        self._last_pulse = None
+        self._unpulsed = None
+        self._unpulsed_seen = None
+        self._pulse_awaiting_public = None
+        self._milestones = {}
+        self._ranks = {}
+
+    def async_process(self, data, values):
+        """Fire events for the transitions between the last snapshot and this one."""
+        self._detect_pulse(data)
+        self._detect_milestones(values)
+
+        public_data = data.get("public") or {}
+        self._detect_rank_changes("user", public_data.get("Ranks"))
+        self._detect_rank_changes("team", (public_data.get("Team") or {}).get("Ranks"))
+
+    def _fire(self, event_type, event_data):
+        """Fire an event for this user."""
+        _LOGGER.debug("Firing %s: %s", event_type, event_data)
+        self._hass.bus.async_fire(event_type, {"user": self._user, **event_data})
+
+    def _detect_pulse(self, data):
+        """Fire a pulse on an unpulsed reset or a new public last pulse."""
+        unpulsed = (data.get("client") or {}).get("unpulsed")
+        if unpulsed and unpulsed is not self._unpulsed:
+            now = datetime.now().timestamp()
+            if WhatPulseAPI._is_pulse(self._unpulsed, unpulsed):
+                # The pulse happened after the previous sample was taken
+                self._pulse_awaiting_public = (
+                    self._unpulsed_seen - PULSE_MATCH_TOLERANCE,
+                    now + PULSE_MATCH_TOLERANCE,
+                )
+                self._fire(EVENT_PULSE, {"source": "client", "unpulsed": dict(self._unpulsed)})
+            self._unpulsed = unpulsed
+            self._unpulsed_seen = now
+
+        last_pulse = as_float((data.get("public") or {}).get("LastPulseUnixTimestamp"))
+        if last_pulse is None or last_pulse == self._last_pulse:
+            return
+
+        if self._last_pulse is not None and last_pulse > self._last_pulse:
+            window = self._pulse_awaiting_public
+            if window and window[0] <= last_pulse <= window[1]:
+                self._pulse_awaiting_public = None
+            else:
+                self._fire(EVENT_PULSE, {"source": "public", "timestamp": int(last_pulse)})
+
+                # A later last pulse means the client's can no longer show up
+                if window and last_pulse > window[1]:
+                    self._pulse_awaiting_public = None
+        self._last_pulse = last_pulse
+
+    def _detect_milestones(self, values):
+        """Fire once when a counter crosses a multiple of its milestone step."""
+        for sensor_type, step in MILESTONES.items():
+            value = as_float(values.get(sensor_type, (None, None))[0])
+            if value is None:
+                continue
+
+            level = int(value // step)
+            previous = self._milestones.get(sensor_type)
+            self._milestones[sensor_type] = level
+
+            if previous is not None and level > previous:
+                self._fire(
+                    EVENT_MILESTONE,
+                    {"counter": sensor_type, "milestone": level * step, "value": value},
+                )
+
+    def _detect_rank_changes(self, scope, ranks):
+        """Fire for every rank that differs from the last snapshot."""
+        if not ranks:
+            return
+
+        previous = self._ranks.get(scope)
+        current = {key: as_float(rank) for key, rank in ranks.items()}
+        self._ranks[scope] = current
+
+        if previous is None:
+            return
+
+        for key, rank in current.items():
+            old_rank = previous.get(key)
+            if rank is None or old_rank is None or rank == old_rank:
+                continue
+
+            self._fire(
+                EVENT_RANK_CHANGE,
+                {
+                    "scope": scope,
+                    "rank": key,
+                    "old_rank": int(old_rank),
+                    "new_rank": int(rank),
+                    "improved": rank < old_rank,
+                },
+            )
+
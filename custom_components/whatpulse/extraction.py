@@ -0,0 +1,110 @@
+"""Precompiled extraction of sensor values from WhatPulse payloads."""
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .parsing import PARSERS
+
+
+def _compile_path(path):
+    """Build an accessor that walks a nested dictionary along a fixed path."""
+    path = tuple(path)
+
+    def accessor(data):
+        for key in path:
+            if not isinstance(data, dict) or key not in data:
+                return None
+            data = data[key]
+        return data
+
+    return accessor
+
+
+@dataclass(frozen=True)
+class SensorSpec:
+    """Compiled description of where a sensor reads its value from."""
+
+    key: str
+    rank_key: Optional[str]
+    is_rank: bool
+    is_realtime: bool
+    client_subtree: Optional[str]
+    client_accessor: Optional[Callable]
+
+
+class ExtractionPlan:
+    """Extract every configured sensor's value from one snapshot in a single pass."""
+
+    def __init__(self, sensor_types, sensor_definitions):
+        """Compile the sensor table into a list of specs."""
+        self.specs = []
+        self.parsers = {}
+        for sensor_type in sensor_types:
+            info = sensor_definitions[sensor_type]
+            client_path = info["client_path"]
+            self.specs.append(
+                SensorSpec(
+                    key=sensor_type,
+                    rank_key=info["rank_key"],
+                    is_rank=info.get("is_rank", False),
+                    is_realtime=bool(client_path) and client_path[0] == "realtime",
+                    client_subtree=client_path[0] if client_path else None,
+                    client_accessor=_compile_path(client_path) if client_path else None,
+                )
+            )
+            if info.get("parse"):
+                self.parsers[sensor_type] = PARSERS[info["parse"]]
+
+    def extract(self, data, fetched=None):
+        """Return {sensor_type: (value, data_source)} for a snapshot.
+
+        When both sources provide a value, the one fetched most recently
+        according to fetched ({"public": ts, <client subtree>: ts}) wins.
+        The value is None when neither source provides it.
+        """
+        fetched = fetched or {}
+        client_data = data.get("client")
+        public_data = data.get("public") or {}
+        public_ranks = public_data.get("Ranks") or {}
+        public_fetched = fetched.get("public") or 0
+
+        values = {}
+        for spec in self.specs:
+            client_value = None
+            if client_data and spec.client_accessor:
+                client_value = spec.client_accessor(client_data)
+
+            if spec.is_realtime:
+                public_value = None
+            elif spec.is_rank:
+                public_value = public_ranks.get(spec.rank_key)
+            else:
+                public_value = public_data.get(spec.key)
+
+            if public_value is None:
+                values[spec.key] = (client_value, "client" if client_value is not None else None)
+            elif client_value is None:
+                values[spec.key] = (public_value, "public")
+            elif public_fetched > (fetched.get(spec.client_subtree) or 0):
+                values[spec.key] = (public_value, "public")
+            else:
+                values[spec.key] = (client_value, "client")
+
+        return values
+
+    @staticmethod
+    def extract_profile(data):
+        """Return the account metadata shared by all sensors as (state, attributes)."""
+        public_data = data.get("public")
+        if not public_data:
+            return None, {}
+
+        team = public_data.get("Team") or {}
+        attributes = {
+            "last_pulse_timestamp": public_data.get("LastPulseUnixTimestamp"),
+            "ranks": dict(public_data.get("Ranks") or {}),
+            "team_name": team.get("Name"),
+            "team_ranks": dict(team.get("Ranks") or {}),
+        }
+
+        return public_data.get("LastPulse"), attributes
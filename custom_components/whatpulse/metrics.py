@@ -0,0 +1,169 @@
+"""Rolling timing metrics of WhatPulse requests and entity updates."""
+
+from collections import deque
+from datetime import datetime
+from time import monotonic
+
+import aiohttp
+
+from .const import DATA_METRICS, DOMAIN, METRICS_PHASES, METRICS_WINDOW
+
+
+def async_get_metrics(hass):
+    """Return the metrics shared by every WhatPulse request."""
+    data = hass.data.setdefault(DOMAIN, {})
+
+    if DATA_METRICS not in data:
+        data[DATA_METRICS] = WhatPulseMetrics()
+
+    return data[DATA_METRICS]
+
+
+def percentile(samples, fraction):
+    """Return the nearest-rank percentile of a sorted list of samples."""
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+class EndpointMetrics:
+    """Counters and the last samples of every phase of one endpoint."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        """Initialize empty metrics."""
+        self.phases = {phase: deque(maxlen=window) for phase in METRICS_PHASES}
+        self.successes = 0
+        self.failures = 0
+        self.bytes = 0
+        self.last_bytes = None
+        self.last_error = None
+        self.last_error_at = None
+
+    def _add_timings(self, timings):
+        """Add the phase durations of one request."""
+        for phase, samples in self.phases.items():
+            if phase in timings:
+                samples.append(timings[phase])
+
+    def record_success(self, timings, size=0):
+        """Record a successful request."""
+        self.successes += 1
+        self.bytes += size
+        self.last_bytes = size
+        self._add_timings(timings)
+
+    def record_failure(self, error, timings=None):
+        """Record a failed request."""
+        self.failures += 1
+        self.last_error = error
+        self.last_error_at = datetime.now().isoformat()
+        self._add_timings(timings or {})
+
+    def as_dict(self):
+        """Return the counters and per-phase percentiles in milliseconds."""
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "bytes": self.bytes,
+            "last_bytes": self.last_bytes,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+            "phases_ms": summarize(self.phases),
+        }
+
+
+def summarize(phases):
+    """Return p50/p95/p99 in milliseconds of every phase with samples."""
+    summary = {}
+    for phase, samples in phases.items():
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        summary[phase] = {
+            "count": len(ordered),
+            "p50": round(percentile(ordered, 0.5) * 1000, 2),
+            "p95": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(percentile(ordered, 0.99) * 1000, 2),
+        }
+    return summary
+
+
+class WhatPulseMetrics:
+    """Metrics of every endpoint, keyed by URL without query string."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self.endpoints = {}
+
+    def endpoint(self, key):
+        """Return the metrics of an endpoint, creating them if needed."""
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointMetrics()
+        return self.endpoints[key]
+
+    def summary(self, prefix):
+        """Merge the metrics of every endpoint whose key starts with prefix."""
+        endpoints = [metrics for key, metrics in self.endpoints.items() if key.startswith(prefix)]
+        phases = {
+            phase: [sample for metrics in endpoints for sample in metrics.phases[phase]]
+            for phase in METRICS_PHASES
+        }
+        failed = [metrics for metrics in endpoints if metrics.last_error_at]
+        last_failed = max(failed, key=lambda metrics: metrics.last_error_at, default=None)
+
+        return {
+            "successes": sum(metrics.successes for metrics in endpoints),
+            "failures": sum(metrics.failures for metrics in endpoints),
+            "bytes": sum(metrics.bytes for metrics in endpoints),
+            "last_error": last_failed.last_error if last_failed else None,
+            "last_error_at": last_failed.last_error_at if last_failed else None,
+            "phases_ms": summarize(phases),
+        }
+
+    def as_dict(self):
+        """Return the metrics of every endpoint."""
+        return {key: metrics.as_dict() for key, metrics in self.endpoints.items()}
+
+    @staticmethod
+    def trace_config():
+        """Return an aiohttp trace config timing DNS, connect and wait.
+
+        Requests opt in by passing a dict as trace_request_ctx, which the
+        phase durations in seconds are written to.
+        """
+
+        async def on_request_start(session, context, params):
+            context.start = monotonic()
+
+        async def on_dns_resolvehost_start(session, context, params):
+            context.dns_start = monotonic()
+
+        async def on_dns_resolvehost_end(session, context, params):
+            _store(context, "dns", monotonic() - context.dns_start)
+
+        async def on_connection_create_start(session, context, params):
+            context.connect_start = monotonic()
+
+        async def on_connection_create_end(session, context, params):
+            _store(context, "connect", monotonic() - context.connect_start)
+
+        async def on_request_end(session, context, params):
+            timings = context.trace_request_ctx
+            if isinstance(timings, dict):
+                elapsed = monotonic() - context.start
+                timings["wait"] = elapsed - timings.get("dns", 0) - timings.get("connect", 0)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+
+def _store(context, phase, duration):
+    """Store a phase duration in the request's timings, if it has any."""
+    if isinstance(context.trace_request_ctx, dict):
+        context.trace_request_ctx[phase] = duration
@@ -0,0 +1,166 @@
+"""OpenMetrics export of the latest WhatPulse snapshots."""
+
+from urllib.parse import urlparse
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import callback
+
+from .const import (
+    DATA_OPENMETRICS,
+    DOMAIN,
+    OPENMETRICS_CLIENT,
+    OPENMETRICS_CONTENT_TYPE,
+    OPENMETRICS_PUBLIC,
+    OPENMETRICS_URL,
+)
+from .parsing import PARSERS, as_float
+
+
+def async_get_exporter(hass):
+    """Return the exporter, registering its view on first use."""
+    data = hass.data.setdefault(DOMAIN, {})
+
+    if DATA_OPENMETRICS not in data:
+        data[DATA_OPENMETRICS] = WhatPulseOpenMetricsExporter()
+        hass.http.register_view(WhatPulseOpenMetricsView(data[DATA_OPENMETRICS]))
+
+    return data[DATA_OPENMETRICS]
+
+
+def _escape(value):
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    """Return a label set such as {user="1",client="localhost:3490"}."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    """Return a sample value, without a fraction for whole numbers."""
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class WhatPulseOpenMetricsExporter:
+    """Render the snapshots of the tracked coordinators once per new sample.
+
+    The rendered body is cached and only dropped when a coordinator
+    reports a public payload or client subtree fetched after the last
+    render, so scrapes never cause upstream requests.
+    """
+
+    def __init__(self):
+        """Initialize the exporter."""
+        self._coordinators = []
+        self._body = None
+
+    @callback
+    def async_track(self, coordinator):
+        """Export a coordinator's snapshots."""
+        self._coordinators.append(coordinator)
+        self._body = None
+        last_fetched = {}
+
+        @callback
+        def _async_invalidate():
+            """Drop the rendered body if the coordinator fetched new data."""
+            fetched = coordinator.api.fetched
+            if fetched != last_fetched:
+                last_fetched.clear()
+                last_fetched.update(fetched)
+                self._body = None
+
+        coordinator.async_add_listener(_async_invalidate)
+
+    @property
+    def body(self):
+        """Return the rendered metrics, rendering them if needed."""
+        if self._body is None:
+            self._body = self._render().encode()
+        return self._body
+
+    def _render(self):
+        """Render every tracked snapshot, grouped by metric family."""
+        families = {}
+
+        def add(family, labels, value, parser=None):
+            metric, metric_type, description = family
+            if parser and value is not None and not isinstance(value, (int, float)):
+                value = PARSERS[parser](str(value))
+            value = as_float(value)
+            if value is None:
+                return
+
+            samples = families.setdefault(metric, (metric_type, description, []))[2]
+            suffix = "_total" if metric_type == "counter" else ""
+            samples.append(f"{metric}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        for coordinator in self._coordinators:
+            api = coordinator.api
+            data = api._data
+            user = api._userid or api._username
+            client_data = data.get("client")
+
+            # Client samples are labelled by client host, and by user if known
+            identity = {"user": user} if user else {}
+            if client_data:
+                identity["client"] = urlparse(api._client_api_url).netloc or api._client_api_url
+
+            public_data = data.get("public")
+            if public_data:
+                labels = {"user": user}
+                for key, (metric, metric_type, description, parser) in OPENMETRICS_PUBLIC.items():
+                    add((metric, metric_type, description), labels, public_data.get(key), parser)
+
+                for rank, value in (public_data.get("Ranks") or {}).items():
+                    add(("whatpulse_rank", "gauge", "Rank of the user"), {**labels, "rank": rank}, value)
+
+                team = public_data.get("Team") or {}
+                for rank, value in (team.get("Ranks") or {}).items():
+                    add(
+                        ("whatpulse_team_rank", "gauge", "Rank of the user within the team"),
+                        {**labels, "team": team.get("Name") or "", "rank": rank},
+                        value,
+                    )
+
+            if client_data:
+                for subtree, fields in OPENMETRICS_CLIENT.items():
+                    subtree_data = client_data.get(subtree) or {}
+                    for key, (metric, metric_type, description, parser) in fields.items():
+                        add((metric, metric_type, description), identity, subtree_data.get(key), parser)
+
+            for source, fetched in api.fetched.items():
+                add(
+                    ("whatpulse_last_fetch_timestamp_seconds", "gauge", "Time the source was last fetched"),
+                    {**identity, "source": source},
+                    fetched,
+                )
+
+        lines = []
+        for metric, (metric_type, description, samples) in families.items():
+            lines.append(f"# TYPE {metric} {metric_type}")
+            lines.append(f"# HELP {metric} {description}.")
+            lines.extend(samples)
+        lines.append("# EOF")
+
+        return "\n".join(lines) + "\n"
+
+
+class WhatPulseOpenMetricsView(HomeAssistantView):
+    """Serve the cached OpenMetrics rendering."""
+
+    url = OPENMETRICS_URL
+    name = "api:whatpulse:metrics"
+
+    def __init__(self, exporter):
+        """Initialize the view."""
+        self._exporter = exporter
+
+    async def get(self, request):
+        """Return the latest metrics."""
+        return web.Response(body=self._exporter.body, headers={"Content-Type": OPENMETRICS_CONTENT_TYPE})
@@ -0,0 +1,117 @@
+"""Parsing of WhatPulse's human-formatted values into numbers."""
+
+from functools import lru_cache
+import re
+
+# WhatPulse formats sizes in powers of 1024; factors convert to megabytes
+_SIZE_FACTORS = {
+    "b": 1 / 1024 ** 2,
+    "kb": 1 / 1024,
+    "mb": 1,
+    "gb": 1024,
+    "tb": 1024 ** 2,
+    "pb": 1024 ** 3,
+}
+_SIZE_PATTERN = re.compile(r"^\s*(\d[\d,]*(?:\.\d+)?)\s*([kmgtp]?)i?b(?:/s)?\s*$", re.IGNORECASE)
+
+# Duration units in seconds, by abbreviation and by (singular) word
+_DURATION_FACTORS = {
+    "y": 365 * 86400, "year": 365 * 86400,
+    "w": 7 * 86400, "week": 7 * 86400,
+    "d": 86400, "day": 86400,
+    "h": 3600, "hr": 3600, "hour": 3600,
+    "m": 60, "min": 60, "minute": 60,
+    "s": 1, "sec": 1, "second": 1,
+}
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]+)", re.IGNORECASE)
+_DURATION_SEPARATORS = re.compile(r"^[\s,]*(?:and[\s,]*)?$", re.IGNORECASE)
+
+# The same strings repeat from poll to poll, so parsed results are cached
+_CACHE_SIZE = 256
+
+
+def _parse_megabytes(text):
+    """Return a formatted size or rate in megabytes (per second), or None."""
+    match = _SIZE_PATTERN.match(text)
+    if not match:
+        return None
+
+    number, prefix = match.groups()
+    return float(number.replace(",", "")) * _SIZE_FACTORS[f"{prefix.lower()}b"]
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_size(text):
+    """Return a formatted size such as "1.23TB" in megabytes, or None."""
+    size = _parse_megabytes(text)
+    if size is None:
+        return None
+    return round(size, 3)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_rate(text):
+    """Return a formatted transfer rate such as "12.5KB/s" in kB/s, or None."""
+    size = _parse_megabytes(text)
+    if size is None:
+        return None
+    return round(size * 1024, 3)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_duration(text):
+    """Return a formatted duration such as "3d4h" or "3 days, 4 hours" in seconds, or None."""
+    seconds = 0
+    position = 0
+    for match in _DURATION_PATTERN.finditer(text):
+        # Only separators may appear between the number/unit pairs
+        if not _DURATION_SEPARATORS.match(text[position:match.start()]):
+            return None
+        position = match.end()
+
+        number, unit = match.groups()
+        unit = unit.lower()
+        factor = _DURATION_FACTORS.get(unit)
+        if factor is None and unit.endswith("s"):
+            factor = _DURATION_FACTORS.get(unit[:-1])
+        if factor is None:
+            return None
+        seconds += float(number) * factor
+
+    if position == 0 or not _DURATION_SEPARATORS.match(text[position:]):
+        return None
+    return int(seconds)
+
+
+def as_float(value):
+    """Return a counter value as float, or None if it is not numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+PARSERS = {
+    "size": parse_size,
+    "rate": parse_rate,
+    "duration": parse_duration,
+}
+
+
+def normalize_values(values, parsers):
+    """Replace formatted values by numbers in place.
+
+    parsers maps sensor types to one of PARSERS. Returns {sensor_type:
+    original string} for every value that was parsed, so the formatted
+    string can still be shown. Values that cannot be parsed become None.
+    """
+    formatted = {}
+    for sensor_type, parser in parsers.items():
+        value, source = values.get(sensor_type, (None, None))
+        if value is None or isinstance(value, (int, float)):
+            continue
+
+        formatted[sensor_type] = value
+        values[sensor_type] = (parser(str(value)), source)
+
+    return formatted
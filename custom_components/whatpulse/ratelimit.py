@@ -0,0 +1,116 @@
+"""Process-wide rate limiting of WhatPulse public API requests."""
+
+import asyncio
+from email.utils import parsedate_to_datetime
+import heapq
+from itertools import count
+import logging
+from time import monotonic, time
+
+from .const import PUBLIC_RATE_LIMIT_BURST, PUBLIC_RATE_LIMIT_RATE, PUBLIC_RETRY_AFTER_DEFAULT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WhatPulsePublicScheduler:
+    """Token bucket shared by every public API request, served by priority.
+
+    Requests wait in a heap ordered by priority (lower first, so callers
+    pass the time their data was last fetched, and never-fetched data
+    goes first). Tokens refill at a steady rate up to a small burst, which
+    also spreads out the requests of many users at startup. A 429 response
+    blocks all requests until its Retry-After has passed.
+    """
+
+    def __init__(self, rate=PUBLIC_RATE_LIMIT_RATE, burst=PUBLIC_RATE_LIMIT_BURST):
+        """Initialize the scheduler with a full bucket."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated = monotonic()
+        self._blocked_until = 0
+        self._waiters = []
+        self._sequence = count()
+        self._timer = None
+
+    @property
+    def queued(self):
+        """Return the number of requests waiting for a token."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def async_acquire(self, priority):
+        """Wait until a request with the given priority may be sent."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was granted but will not be used
+                self._tokens = min(self._burst, self._tokens + 1)
+                self._dispatch()
+            raise
+
+    def defer(self, retry_after):
+        """Hold back every request after a 429 response."""
+        seconds = _retry_after_seconds(retry_after)
+        _LOGGER.warning(f"WhatPulse public API is rate limiting, pausing requests for {seconds} seconds")
+
+        self._blocked_until = max(self._blocked_until, monotonic() + seconds)
+        self._tokens = 0
+        self._dispatch()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last refill, none while blocked."""
+        earned = max(0, now - max(self._updated, self._blocked_until)) * self._rate
+        self._tokens = min(self._burst, self._tokens + earned)
+        self._updated = now
+
+    def _dispatch(self):
+        """Grant tokens to the waiting requests in priority order."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        now = monotonic()
+        self._refill(now)
+
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+                break
+
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self._rate
+                break
+
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            future.set_result(None)
+        else:
+            return
+
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+def _retry_after_seconds(retry_after):
+    """Return the delay of a Retry-After header (seconds or HTTP date)."""
+    if retry_after:
+        try:
+            return max(0, int(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            return max(0, int(parsedate_to_datetime(retry_after).timestamp() - time()))
+        except (TypeError, ValueError):
+            pass
+
+    return PUBLIC_RETRY_AFTER_DEFAULT
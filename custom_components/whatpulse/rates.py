@@ -0,0 +1,124 @@
+"""Rolling rates derived locally from WhatPulse counter samples."""
+
+from array import array
+
+from .const import RATE_BUFFER_SIZE, RATE_CHANNELS, RATE_WINDOWS
+from .parsing import as_float
+
+
+class RateRingBuffer:
+    """Fixed-size ring buffer of timestamped samples of several counters.
+
+    Samples live in flat arrays of doubles, so memory stays bounded however
+    long Home Assistant runs. Every window keeps a cursor on its oldest
+    sample; cursors only move forward, which makes each new sample cost
+    O(1) amortized per window.
+    """
+
+    def __init__(self, channels, windows, capacity=RATE_BUFFER_SIZE):
+        """Initialize an empty buffer."""
+        self._channels = len(channels)
+        self._capacity = capacity
+        self._windows = dict(windows)
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity * self._channels))
+        self._count = 0
+        self._starts = {window: 0 for window in self._windows}
+
+    def __len__(self):
+        """Return the number of samples held."""
+        return min(self._count, self._capacity)
+
+    def add(self, timestamp, values):
+        """Append a sample and advance the window cursors."""
+        slot = self._count % self._capacity
+        self._times[slot] = timestamp
+        offset = slot * self._channels
+        for index, value in enumerate(values):
+            self._values[offset + index] = value
+        self._count += 1
+
+        oldest = max(0, self._count - self._capacity)
+        newest = self._count - 1
+        for window, seconds in self._windows.items():
+            start = max(self._starts[window], oldest)
+            while start < newest and self._times[start % self._capacity] < timestamp - seconds:
+                start += 1
+            self._starts[window] = start
+
+    def rate(self, channel, window):
+        """Return the per-second rate of a channel over a window, or None."""
+        newest = self._count - 1
+        start = self._starts[window]
+        if newest < 1 or start >= newest:
+            return None
+
+        newest_slot = newest % self._capacity
+        start_slot = start % self._capacity
+        elapsed = self._times[newest_slot] - self._times[start_slot]
+        if elapsed <= 0:
+            return None
+
+        delta = (
+            self._values[newest_slot * self._channels + channel]
+            - self._values[start_slot * self._channels + channel]
+        )
+        return max(0.0, delta / elapsed)
+
+
+class RateEngine:
+    """Turn client samples into the configured rate sensor values."""
+
+    def __init__(self, sensor_types, sensor_definitions):
+        """Initialize the engine for the configured rate sensors."""
+        self._channels = list(RATE_CHANNELS)
+        self._sensors = {
+            sensor_type: sensor_definitions[sensor_type]["rate"]
+            for sensor_type in sensor_types
+            if sensor_definitions[sensor_type].get("rate")
+        }
+        self._buffer = RateRingBuffer(self._channels, RATE_WINDOWS)
+        self._previous_unpulsed = None
+        self._totals = [0.0] * len(self._channels)
+
+    def __bool__(self):
+        """Return True if any rate sensor is configured."""
+        return bool(self._sensors)
+
+    def add_sample(self, timestamp, client_data):
+        """Record the counters of a client snapshot."""
+        unpulsed = client_data.get("unpulsed")
+        totals = client_data.get("account-totals")
+
+        if unpulsed:
+            # Accumulate unpulsed deltas into monotonic counters; a drop means
+            # the client pulsed and started counting from zero again
+            for index, channel in enumerate(self._channels):
+                value = as_float(unpulsed.get(RATE_CHANNELS[channel]["unpulsed"]))
+                if value is None:
+                    continue
+                previous = None
+                if self._previous_unpulsed:
+                    previous = as_float(self._previous_unpulsed.get(RATE_CHANNELS[channel]["unpulsed"]))
+                if previous is not None:
+                    self._totals[index] += value - previous if value >= previous else value
+            self._previous_unpulsed = unpulsed
+        elif totals:
+            for index, channel in enumerate(self._channels):
+                value = as_float(totals.get(RATE_CHANNELS[channel]["totals"]))
+                if value is not None:
+                    self._totals[index] = value * RATE_CHANNELS[channel]["totals_scale"]
+        else:
+            return
+
+        self._buffer.add(timestamp, self._totals)
+
+    def values(self):
+        """Return {sensor_type: (value, data_source)} for the rate sensors."""
+        values = {}
+        for sensor_type, (channel, window) in self._sensors.items():
+            rate = self._buffer.rate(self._channels.index(channel), window)
+            if rate is not None:
+                rate = round(rate * RATE_CHANNELS[channel]["per"], 2)
+            values[sensor_type] = (rate, "derived" if rate is not None else None)
+        return values
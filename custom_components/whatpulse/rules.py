@@ -0,0 +1,99 @@
+"""Threshold rules evaluated against every decoded sample."""
+
+from homeassistant.util import slugify
+
+from .const import CONF_ABOVE, CONF_BELOW, CONF_DELAY_OFF, CONF_DELAY_ON, CONF_HYSTERESIS, CONF_RULE_SENSOR
+from .parsing import as_float
+
+
+class Rule:
+    """One compiled threshold rule and its current state.
+
+    The rule is on while the value is above `above` and/or below `below`.
+    Once on, it only turns off after the value moved `hysteresis` past the
+    threshold. A new state must hold for `delay_on` or `delay_off` seconds
+    before it is taken over.
+    """
+
+    __slots__ = (
+        "name",
+        "key",
+        "sensor_type",
+        "above",
+        "below",
+        "hysteresis",
+        "delay_on",
+        "delay_off",
+        "state",
+        "last_value",
+        "_pending_since",
+    )
+
+    def __init__(self, config):
+        """Compile the rule from its configuration."""
+        self.name = config["name"]
+        self.key = slugify(self.name)
+        self.sensor_type = config[CONF_RULE_SENSOR]
+        self.above = config.get(CONF_ABOVE)
+        self.below = config.get(CONF_BELOW)
+        self.hysteresis = config[CONF_HYSTERESIS]
+        self.delay_on = config[CONF_DELAY_ON]
+        self.delay_off = config[CONF_DELAY_OFF]
+        self.state = False
+        self.last_value = None
+        self._pending_since = None
+
+    def _condition(self, value):
+        """Return whether the value satisfies the rule, given its state."""
+        margin = self.hysteresis if self.state else 0
+        if self.above is not None and value <= self.above - margin:
+            return False
+        if self.below is not None and value >= self.below + margin:
+            return False
+        return True
+
+    def evaluate(self, value, now):
+        """Evaluate one sample; return True if the state changed."""
+        value = as_float(value)
+        if value is None:
+            return False
+
+        self.last_value = value
+        target = self._condition(value)
+        if target == self.state:
+            self._pending_since = None
+            return False
+
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since < (self.delay_on if target else self.delay_off):
+            return False
+
+        self.state = target
+        self._pending_since = None
+        return True
+
+
+class RulesEngine:
+    """Evaluate every rule of one coordinator against its latest values."""
+
+    def __init__(self, rules_config):
+        """Compile the configured rules."""
+        self.rules = tuple(Rule(config) for config in rules_config)
+        self.sensor_types = {rule.sensor_type for rule in self.rules}
+
+    def __bool__(self):
+        """Return True if any rule is configured."""
+        return bool(self.rules)
+
+    def evaluate(self, values, now):
+        """Evaluate every rule against {sensor_type: (value, data_source)}.
+
+        Return True if any rule changed state.
+        """
+        changed = False
+        for rule in self.rules:
+            value = values.get(rule.sensor_type)
+            if rule.evaluate(value[0] if value else None, now):
+                changed = True
+        return changed
@@ -1,40 +1,110 @@
 """Sensor for WhatPulse"""
 
-from datetime import datetime
-import json
+import asyncio
 import logging
+from time import monotonic
+from urllib.parse import urlparse
 import voluptuous as vol
-import requests
 
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA,
     SensorEntity,
 )
-from homeassistant.const import CONF_USERNAME
-from homeassistant.util import Throttle
+from homeassistant.const import CONF_NAME, CONF_USERNAME, EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.discovery import async_load_platform
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import slugify
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
     API_TYPE_BOTH,
+    CONF_ABOVE,
+    CONF_BELOW,
+    CONF_DELAY_OFF,
+    CONF_DELAY_ON,
+    CONF_HYSTERESIS,
+    CONF_RULE_SENSOR,
+    CONF_RULES,
+    DATA_HASS_CONFIG,
+    DATA_RULES,
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    CONF_ADAPTIVE_POLLING,
+    CONF_CLIENTS,
+    CONF_DIAGNOSTIC_SENSORS,
+    DATA_APIS,
+    DATA_COORDINATORS,
+    CONF_FLEET_JITTER,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_OPENMETRICS,
+    CONF_REALTIME_DEADBAND,
+    CONF_REALTIME_MIN_WRITE_INTERVAL,
+    CONF_REALTIME_STREAMING,
+    CONF_STREAM_MAX_RATE,
+    CONF_STREAM_POLL_INTERVAL,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_FLEET_JITTER,
+    DEFAULT_MAX_CONCURRENCY,
+    DOMAIN,
     API_TYPE_CLIENT,
     API_TYPE_PUBLIC,
+    CLIENT_REFRESH_RATE,
     CONF_API_TYPE,
     CONF_CLIENT_API_URL,
     CONF_SENSORS,
+    CONF_TEAM,
+    CONF_TEAM_RANK_BY,
     CONF_USERID,
     DEFAULT_API_TYPE,
     DEFAULT_CLIENT_API_URL,
     DEFAULT_SENSORS,
-    MIN_TIME_BETWEEN_UPDATES_CLIENT,
-    MIN_TIME_BETWEEN_UPDATES_PUBLIC,
+    DEFAULT_STREAM_MAX_RATE,
+    DEFAULT_STREAM_POLL_INTERVAL,
+    DEFAULT_TEAM_RANK_BY,
+    LATENCY_DEADBAND,
+    NORMALIZATION_MIGRATION,
     PUBLIC_API_URL,
-    CLIENT_REFRESH_RATE,
-    PUBLIC_REFRESH_RATE,
     SENSOR_TYPES,
+    STORAGE_VERSION,
+    TEAM_MEMBER_SENSORS,
 )
+from .api import WhatPulseAPI, WhatPulseTeamAPI
+from .coordinator import WhatPulseCoordinator, WhatPulseFleetScheduler, WhatPulseTeamCoordinator
+from .extraction import ExtractionPlan
+from .rates import RateEngine
+from .rules import RulesEngine
+from .metrics import async_get_metrics
+from .openmetrics import async_get_exporter
+from .services import async_setup_backfill_service, async_setup_diagnostics_service
+from .statistics import WhatPulseStatisticsImporter
+from .streaming import WhatPulseRealtimeStream
+from .totals import LiveTotals
 
 _LOGGER = logging.getLogger(__name__)
 
+RULE_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Required(CONF_NAME): cv.string,
+        vol.Required(CONF_RULE_SENSOR): vol.In(list(SENSOR_TYPES.keys())),
+        vol.Optional(CONF_ABOVE): vol.Coerce(float),
+        vol.Optional(CONF_BELOW): vol.Coerce(float),
+        vol.Optional(CONF_HYSTERESIS, default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_DELAY_ON, default=0): cv.positive_int,
+        vol.Optional(CONF_DELAY_OFF, default=0): cv.positive_int,
+    }),
+    cv.has_at_least_one_key(CONF_ABOVE, CONF_BELOW),
+)
+
 # Schema for platform configuration
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_USERNAME): cv.string,
@@ -46,6 +116,27 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_SENSORS, default=DEFAULT_SENSORS): vol.All(
         cv.ensure_list, [vol.In(list(SENSOR_TYPES.keys()))]
     ),
+    vol.Optional(CONF_ADAPTIVE_POLLING, default=False): cv.boolean,
+    vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_ADAPTIVE_MIN_INTERVAL): cv.positive_int,
+    vol.Optional(CONF_MAX_INTERVAL, default=DEFAULT_ADAPTIVE_MAX_INTERVAL): cv.positive_int,
+    vol.Optional(CONF_REALTIME_DEADBAND, default=0): vol.Coerce(float),
+    vol.Optional(CONF_REALTIME_MIN_WRITE_INTERVAL, default=0): cv.positive_int,
+    vol.Optional(CONF_REALTIME_STREAMING, default=False): cv.boolean,
+    vol.Optional(CONF_STREAM_POLL_INTERVAL, default=DEFAULT_STREAM_POLL_INTERVAL): vol.All(
+        vol.Coerce(float), vol.Range(min=0.05)
+    ),
+    vol.Optional(CONF_STREAM_MAX_RATE, default=DEFAULT_STREAM_MAX_RATE): vol.All(
+        vol.Coerce(float), vol.Range(min=0.1, max=10)
+    ),
+    vol.Optional(CONF_IMPORT_STATISTICS, default=False): cv.boolean,
+    vol.Optional(CONF_DIAGNOSTIC_SENSORS, default=False): cv.boolean,
+    vol.Optional(CONF_OPENMETRICS, default=False): cv.boolean,
+    vol.Optional(CONF_CLIENTS): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY): cv.positive_int,
+    vol.Optional(CONF_FLEET_JITTER, default=DEFAULT_FLEET_JITTER): vol.Coerce(float),
+    vol.Optional(CONF_TEAM): cv.string,
+    vol.Optional(CONF_TEAM_RANK_BY, default=DEFAULT_TEAM_RANK_BY): vol.In(TEAM_MEMBER_SENSORS),
+    vol.Optional(CONF_RULES, default=[]): vol.All(cv.ensure_list, [RULE_SCHEMA]),
 })
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
@@ -54,162 +145,321 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
     userid = config.get(CONF_USERID)
     api_type = config.get(CONF_API_TYPE)
     client_api_url = config.get(CONF_CLIENT_API_URL)
-    sensor_types = config.get(CONF_SENSORS)
+    plan = ExtractionPlan(_tracked_sensor_types(config), SENSOR_TYPES)
+
+    await _async_migrate_normalized_units(hass)
+    async_setup_diagnostics_service(hass)
+
+    # Fleet mode polls a list of clients through the client API only
+    if config.get(CONF_CLIENTS):
+        await _async_setup_fleet(hass, config, async_add_entities, plan)
+        return
+
+    # Team mode tracks every member of a team through one public request
+    if config.get(CONF_TEAM):
+        if config.get(CONF_RULES):
+            _LOGGER.warning("WhatPulse rules are not supported in team mode")
+        await _async_setup_team(hass, config, async_add_entities)
+        return
 
     # Require username or userid only for public API
     if api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH] and not (username or userid):
         _LOGGER.error("Either username or userid must be provided when using public API")
         return False
 
-    # Initialize API based on configuration
-    api = WhatPulseAPI(username, userid, api_type, client_api_url)
+    coordinator = await _async_setup_coordinator(
+        hass, config, plan, username, userid, api_type, client_api_url
+    )
 
     entities = []
-    for sensor_type in sensor_types:
-        sensor_info = SENSOR_TYPES[sensor_type]
 
-        # Skip client-only sensors if not using client API
-        if api_type == API_TYPE_PUBLIC and sensor_info["client_path"] is not None and sensor_info["client_path"][0] in ["realtime", "unpulsed"]:
-            _LOGGER.warning(f"Skipping {sensor_type} as it requires client API access")
+    # Account metadata lives on a single entity instead of on every sensor
+    if api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
+        entities.append(WhatPulseProfileSensor(coordinator))
+
+    entities.extend(_create_sensors(config, coordinator, api_type))
+
+    async_add_entities(entities)
+    _async_load_rule_sensors(hass, [(coordinator, None)])
+
+
+def _tracked_sensor_types(config):
+    """Return the monitored sensor types plus the ones read by rules."""
+    sensor_types = list(config.get(CONF_SENSORS))
+    for rule in config.get(CONF_RULES):
+        if rule[CONF_RULE_SENSOR] not in sensor_types:
+            sensor_types.append(rule[CONF_RULE_SENSOR])
+    return sensor_types
+
+
+@callback
+def _async_load_rule_sensors(hass, coordinators):
+    """Load the binary sensor platform for the rules of (coordinator, client host) pairs."""
+    if not any(coordinator.rules for coordinator, _ in coordinators):
+        return
+
+    data = hass.data.setdefault(DOMAIN, {})
+    setups = data.setdefault(DATA_RULES, [])
+    setups.append(coordinators)
+
+    # Pass the full configuration, or binary_sensor would be set up without
+    # the user's own binary_sensor platforms if it is not set up yet
+    hass.async_create_task(
+        async_load_platform(
+            hass, "binary_sensor", DOMAIN, {DATA_RULES: len(setups) - 1}, data.get(DATA_HASS_CONFIG, {})
+        )
+    )
+
+
+async def _async_migrate_normalized_units(hass):
+    """Move existing entities of formatted sensors to their numeric units, once."""
+    store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.migrations")
+    migrations = await store.async_load() or {}
+    if migrations.get(NORMALIZATION_MIGRATION):
+        return
+
+    registry = er.async_get(hass)
+    for entry in list(registry.entities.values()):
+        if entry.platform != DOMAIN or entry.domain != "sensor":
             continue
 
-        entities.append(
-            WhatPulseSensor(
-                api,
-                sensor_type,
-                sensor_info["name"],
-                sensor_info["rank_key"],
-                sensor_info["icon"],
-                sensor_info["unit"],
-                sensor_info["client_path"],
+        # Unique IDs end in the sensor type
+        sensor_info = SENSOR_TYPES.get(entry.unique_id.rsplit("_", 1)[-1])
+        if not sensor_info or not sensor_info.get("parse"):
+            continue
+
+        if entry.unit_of_measurement != sensor_info["unit"]:
+            _LOGGER.info(f"Migrating {entry.entity_id} to unit {sensor_info['unit']}")
+            registry.async_update_entity(entry.entity_id, unit_of_measurement=sensor_info["unit"])
+
+    migrations[NORMALIZATION_MIGRATION] = True
+    await store.async_save(migrations)
+
+
+async def _async_setup_fleet(hass, config, async_add_entities, plan):
+    """Set up one coordinator per client, sharing a bounded scheduler."""
+    scheduler = WhatPulseFleetScheduler(
+        config.get(CONF_MAX_CONCURRENCY), config.get(CONF_FLEET_JITTER)
+    )
+
+    coordinators = await asyncio.gather(
+        *(
+            _async_setup_coordinator(
+                hass, config, plan, None, None, API_TYPE_CLIENT, client_api_url, scheduler
             )
+            for client_api_url in config.get(CONF_CLIENTS)
         )
+    )
 
-    async_add_entities(entities, True)
-
-class WhatPulseAPI:
-    """Class to handle WhatPulse API calls."""
-
-    def __init__(self, username=None, userid=None, api_type=DEFAULT_API_TYPE, client_api_url=DEFAULT_CLIENT_API_URL):
-        """Initialize the API."""
-        self._username = username
-        self._userid = userid
-        self._api_type = api_type
-        self._client_api_url = client_api_url
-        self._data = {}
-        self._last_refresh_public = None
-        self._last_refresh_client = None
-        self._public_refresh_rate = PUBLIC_REFRESH_RATE
-        self._client_refresh_rate = CLIENT_REFRESH_RATE
-
-    def _update(self):
-        """Update the WhatPulse data."""
-        current_time = datetime.now().timestamp()
-
-        # Update public API data if needed
-        if self._api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
-            last_refresh = 0 if self._last_refresh_public is None else self._last_refresh_public
-            if current_time >= (last_refresh + self._public_refresh_rate):
-                if self._update_public_data():
-                    self._last_refresh_public = current_time
-
-        # Update client API data if needed
-        if self._api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
-            last_refresh = 0 if self._last_refresh_client is None else self._last_refresh_client
-            if current_time >= (last_refresh + self._client_refresh_rate):
-                if self._update_client_data():
-                    self._last_refresh_client = current_time
-
-        return self._data
-
-    def _update_public_data(self):
-        """Get the latest data from WhatPulse public API."""
-        data = self._request_update_public()
-        if data:
-            self._data["public"] = data
-            return True
-        return False
+    entities = []
+    rule_coordinators = []
+    for coordinator in coordinators:
+        client_host = urlparse(coordinator.api._client_api_url).netloc or coordinator.api._client_api_url
+        entities.extend(_create_sensors(config, coordinator, API_TYPE_CLIENT, client_host))
+        rule_coordinators.append((coordinator, client_host))
 
-    def _update_client_data(self):
-        """Get the latest data from WhatPulse client API."""
-        data = self._request_update_client()
-        if data:
-            self._data["client"] = data
-            return True
-        return False
+    # Fleet-wide totals of the summable per-client sensors
+    for sensor_type in config.get(CONF_SENSORS):
+        client_path = SENSOR_TYPES[sensor_type]["client_path"]
+        if client_path and client_path[0] in ["realtime", "unpulsed"]:
+            entities.append(WhatPulseFleetSensor(coordinators, sensor_type))
+
+    async_add_entities(entities)
+    _async_load_rule_sensors(hass, rule_coordinators)
+
+
+async def _async_setup_team(hass, config, async_add_entities):
+    """Set up the member sensors and leaderboard of a team."""
+    # Only counters present in the team payload can be reported per member
+    sensor_types = [
+        sensor_type for sensor_type in config.get(CONF_SENSORS) if sensor_type in TEAM_MEMBER_SENSORS
+    ] or [config.get(CONF_TEAM_RANK_BY)]
+
+    api = WhatPulseTeamAPI(hass, config.get(CONF_TEAM))
+    coordinator = WhatPulseTeamCoordinator(hass, api, sensor_types, config.get(CONF_TEAM_RANK_BY))
+    await coordinator.async_refresh()
+
+    known_members = set()
+
+    @callback
+    def _async_add_new_members():
+        """Add sensors for members that were not seen before."""
+        new_members = [member_id for member_id in coordinator.members if member_id not in known_members]
+        if not new_members:
+            return
+
+        known_members.update(new_members)
+        async_add_entities(
+            [
+                WhatPulseTeamMemberSensor(coordinator, member_id, sensor_type)
+                for member_id in new_members
+                for sensor_type in sensor_types
+            ]
+        )
+
+    _async_add_new_members()
+    async_add_entities([WhatPulseTeamLeaderboardSensor(coordinator)])
+
+    # Members joining the team later get their sensors on the next fetch
+    coordinator.async_add_listener(_async_add_new_members)
+
+
+async def _async_setup_coordinator(hass, config, plan, username, userid, api_type, client_api_url, scheduler=None):
+    """Create the API and coordinator for one WhatPulse account or client."""
+    # Only the client subtrees read by the configured sensors and rules are polled
+    sensor_types = _tracked_sensor_types(config)
+    client_subtrees = {
+        SENSOR_TYPES[sensor_type]["client_path"][0]
+        for sensor_type in sensor_types
+        if SENSOR_TYPES[sensor_type]["client_path"]
+    }
+
+    # Live totals add the unpulsed counters to the pulsed totals
+    totals = None
+    if api_type == API_TYPE_BOTH:
+        totals = LiveTotals(sensor_types)
+        if totals:
+            client_subtrees.add("unpulsed")
+
+    # Initialize API based on configuration
+    api = WhatPulseAPI(hass, username, userid, api_type, client_api_url, client_subtrees)
+
+    # Public users can have their pulse history backfilled
+    if api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
+        hass.data.setdefault(DOMAIN, {}).setdefault(DATA_APIS, {})[str(userid or username)] = api
+        async_setup_backfill_service(hass)
 
-    def _request_update_public(self):
-        """Request update from public WhatPulse API."""
-        # Build the URL based on what we have (userid preferred)
-        url = PUBLIC_API_URL
+    # Rate sensors and live totals need unpulsed samples at the client refresh rate
+    rates = RateEngine(sensor_types, SENSOR_TYPES)
+    if (rates and api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]) or totals:
+        api.set_tier_refresh_rate("unpulsed", CLIENT_REFRESH_RATE)
 
-        if self._userid:
-            url += f"userid={self._userid}&format=json"
-        elif self._username:
-            url += f"user={self._username}&format=json"
+    if config.get(CONF_ADAPTIVE_POLLING):
+        api.set_adaptive_polling(config.get(CONF_MIN_INTERVAL), config.get(CONF_MAX_INTERVAL))
+
+    # Start from the last persisted payloads so entities are populated at once
+    await api.async_load_cache()
+
+    # Counters can be imported as hourly statistics instead of compiled from states
+    statistics = None
+    if config.get(CONF_IMPORT_STATISTICS):
+        if "recorder" in hass.config.components:
+            statistics = WhatPulseStatisticsImporter(
+                hass, str(userid or username or client_api_url), config.get(CONF_SENSORS), SENSOR_TYPES
+            )
+            await statistics.async_load()
         else:
-            _LOGGER.error("No username or userid provided for WhatPulse public API")
-            return False
+            _LOGGER.warning("Importing WhatPulse statistics requires the recorder integration")
 
-        try:
-            response = requests.get(url, timeout=10)
+    # One coordinator polls the API and pushes the result to every sensor
+    rules = RulesEngine(config.get(CONF_RULES))
+    coordinator = WhatPulseCoordinator(hass, api, plan, scheduler, rates, statistics, totals, rules)
+    await coordinator.async_refresh()
+    hass.data.setdefault(DOMAIN, {}).setdefault(DATA_COORDINATORS, []).append(coordinator)
 
-            if response.status_code != 200:
-                _LOGGER.error(f"Unable to perform public API request: {response.content}")
-                return False
+    # The latest snapshots can be scraped without going through entity states
+    if config.get(CONF_OPENMETRICS):
+        if "http" in hass.config.components:
+            async_get_exporter(hass).async_track(coordinator)
+        else:
+            _LOGGER.warning("Exporting WhatPulse OpenMetrics requires the http integration")
 
-            return response.json()
+    # Realtime sensors can be streamed instead of polled with the other subtrees
+    if config.get(CONF_REALTIME_STREAMING) and "realtime" in client_subtrees and api_type != API_TYPE_PUBLIC:
+        coordinator.stream = WhatPulseRealtimeStream(
+            hass, coordinator, config.get(CONF_STREAM_POLL_INTERVAL), config.get(CONF_STREAM_MAX_RATE)
+        )
+        coordinator.stream.async_start()
 
-        except Exception as ex:
-            _LOGGER.error(f"Error fetching WhatPulse public API data: {ex}")
-            return False
+    return coordinator
 
-    def _request_update_client(self):
-        """Request update from WhatPulse client API."""
-        url = f"{self._client_api_url}/v1/all-stats"
 
-        try:
-            response = requests.get(url, timeout=10)
+def _create_sensors(config, coordinator, api_type, client_host=None):
+    """Create the configured sensors for one coordinator."""
+    entities = []
 
-            if response.status_code != 200:
-                _LOGGER.error(f"Unable to perform client API request: {response.content}")
-                return False
+    # Diagnostic health of every endpoint this coordinator talks to
+    if api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
+        entities.append(WhatPulseHealthSensor(coordinator, "public"))
+    if api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
+        entities.append(WhatPulseHealthSensor(coordinator, "client", client_host))
 
-            return response.json()
+    # Optional request and entity update latencies
+    if config.get(CONF_DIAGNOSTIC_SENSORS):
+        if api_type in [API_TYPE_PUBLIC, API_TYPE_BOTH]:
+            entities.append(WhatPulseLatencySensor(coordinator, "public"))
+        if api_type in [API_TYPE_CLIENT, API_TYPE_BOTH]:
+            entities.append(WhatPulseLatencySensor(coordinator, "client", client_host))
+        entities.append(WhatPulseLatencySensor(coordinator, "entities", client_host))
+    for sensor_type in config.get(CONF_SENSORS):
+        sensor_info = SENSOR_TYPES[sensor_type]
 
-        except Exception as ex:
-            _LOGGER.error(f"Error fetching WhatPulse client API data: {ex}")
-            return False
+        # Skip client-only sensors if not using client API
+        if api_type == API_TYPE_PUBLIC and (sensor_info.get("rate") or sensor_info["client_path"] is not None and sensor_info["client_path"][0] in ["realtime", "unpulsed"]):
+            _LOGGER.warning(f"Skipping {sensor_type} as it requires client API access")
+            continue
+
+        # Realtime sensors are noisy, so they get the deadband and write limit
+        is_realtime = sensor_info["client_path"] is not None and sensor_info["client_path"][0] == "realtime"
+
+        entities.append(
+            WhatPulseSensor(
+                coordinator,
+                sensor_type,
+                sensor_info["name"],
+                sensor_info["rank_key"],
+                sensor_info["icon"],
+                sensor_info["unit"],
+                sensor_info["client_path"],
+                deadband=config.get(CONF_REALTIME_DEADBAND) if is_realtime else 0,
+                min_write_interval=config.get(CONF_REALTIME_MIN_WRITE_INTERVAL) if is_realtime else 0,
+                client_host=client_host,
+            )
+        )
 
+    return entities
 
-class WhatPulseSensor(SensorEntity):
+
+class WhatPulseSensor(CoordinatorEntity, SensorEntity):
     """Representation of a WhatPulse sensor."""
 
-    def __init__(self, api, sensor_type, name, rank_key, icon, unit, client_path=None):
+    def __init__(self, coordinator, sensor_type, name, rank_key, icon, unit, client_path=None, deadband=0, min_write_interval=0, client_host=None):
         """Initialize the WhatPulse sensor."""
-        self._api = api
+        super().__init__(coordinator)
+        self._api = coordinator.api
         self._sensor_type = sensor_type
         self._name = name
         self._rank_key = rank_key
         self._icon = icon
         self._unit = unit
         self._client_path = client_path
+        self._client_host = client_host
         self._state = None
         self._attributes = {
-            "last_pulse": None,
-            "rank": None,
             "data_source": None,
         }
+        self._deadband = deadband
+        self._min_write_interval = min_write_interval
+        self._last_write = None
+        self._pending_write = None
+        self._written_available = None
+
+        self._update_from_values(coordinator.values)
 
     @property
     def name(self):
         """Return the name of the sensor."""
+        if self._client_host:
+            return f"WhatPulse {self._client_host} {self._name}"
         return f"WhatPulse {self._name}"
 
     @property
     def unique_id(self):
         """Return a unique ID."""
-        if self._api._userid:
+        if self._client_host:
+            # Fleet clients are told apart by their host
+            return f"whatpulse_client_{self._client_host}_{self._sensor_type}"
+        elif self._api._userid:
             return f"whatpulse_{self._api._userid}_{self._sensor_type}"
         elif self._api._username:
             return f"whatpulse_{self._api._username}_{self._sensor_type}"
@@ -217,6 +467,19 @@ class WhatPulseSensor(SensorEntity):
             # For client-only API without username/userid
             return f"whatpulse_client_{self._sensor_type}"
 
+    @property
+    def device_info(self):
+        """Return a device per fleet client."""
+        if not self._client_host:
+            return None
+
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._client_host)},
+            name=f"WhatPulse {self._client_host}",
+            manufacturer="WhatPulse",
+            configuration_url=self._api._client_api_url,
+        )
+
     @property
     def state(self):
         """Return the state of the sensor."""
@@ -227,6 +490,23 @@ class WhatPulseSensor(SensorEntity):
         """Return the unit of measurement."""
         return self._unit
 
+    @property
+    def state_class(self):
+        """Return the state class, so counters compress into statistics.
+
+        Imported counters have none, or the recorder would compile their
+        statistics a second time.
+        """
+        statistics = self.coordinator.statistics
+        if statistics and self._sensor_type in statistics:
+            return None
+        return SENSOR_TYPES[self._sensor_type].get("state_class")
+
+    @property
+    def device_class(self):
+        """Return the device class of parsed sizes, rates and durations."""
+        return SENSOR_TYPES[self._sensor_type].get("device_class")
+
     @property
     def icon(self):
         """Return the icon to use in the frontend."""
@@ -237,70 +517,534 @@ class WhatPulseSensor(SensorEntity):
         """Return the state attributes."""
         return self._attributes
 
-    def _get_nested_value(self, data, path):
-        """Get a value from a nested dictionary using a path list."""
-        if not path or not data:
-            return None
+    async def async_added_to_hass(self):
+        """Register cleanup of a pending rate-limited write."""
+        await super().async_added_to_hass()
+        self._written_available = self.available
+        self.async_on_remove(self._cancel_pending_write)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator, writing state only on change."""
+        previous_state = self._state
+        previous_attributes = dict(self._attributes)
+
+        self._update_from_values(self.coordinator.values)
+
+        # Becoming unavailable (or available again) is always written
+        available = self.available
+        if available != self._written_available:
+            self._written_available = available
+            self._async_write_rate_limited()
+            return
 
-        temp = data
-        for key in path:
-            if key in temp:
-                temp = temp[key]
-            else:
-                return None
-        return temp
+        if self._state == previous_state and self._attributes == previous_attributes:
+            return
 
-    def update(self):
-        """Update data from WhatPulse API."""
-        data = self._api._update()
+        if self._within_deadband(previous_state, self._state):
+            # Keep reporting the last written value
+            self._state = previous_state
+            self._attributes = previous_attributes
+            return
 
-        # Check if this is a rank sensor
-        is_rank = SENSOR_TYPES[self._sensor_type].get("is_rank", False)
+        self._async_write_rate_limited()
 
-        # Try to get data from client API first if available and applicable
-        if "client" in data and self._client_path:
-            client_data = data["client"]
-            value = self._get_nested_value(client_data, self._client_path)
+    def _within_deadband(self, previous, current):
+        """Return True if a numeric change is too small to be worth writing."""
+        if not self._deadband or previous is None or current is None:
+            return False
 
-            if value is not None:
-                self._state = value
-                self._attributes["data_source"] = "client"
+        try:
+            previous = float(previous)
+            current = float(current)
+        except (TypeError, ValueError):
+            return False
 
-                # For realtime stats, we don't need to check public API
-                if self._client_path and self._client_path[0] == "realtime":
+        # Always report activity stopping, however small the step
+        return current != 0 and abs(current - previous) < self._deadband
+
+    @callback
+    def _async_write_rate_limited(self):
+        """Write the state, deferring it if the last write was too recent."""
+        if self._min_write_interval:
+            if self._pending_write:
+                # The scheduled write will pick up the latest state
+                return
+
+            if self._last_write is not None:
+                elapsed = monotonic() - self._last_write
+                if elapsed < self._min_write_interval:
+                    self._pending_write = async_call_later(
+                        self.hass, self._min_write_interval - elapsed, self._async_write_pending
+                    )
                     return
 
-        # Fall back to public API data if available and no client data or realtime
-        if "public" in data:
-            public_data = data["public"]
+        self._last_write = monotonic()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_write_pending(self, _now):
+        """Write the state that was held back by the rate limit."""
+        self._pending_write = None
+        self._last_write = monotonic()
+        self.async_write_ha_state()
+
+    @callback
+    def _cancel_pending_write(self):
+        """Cancel a pending rate-limited write."""
+        if self._pending_write:
+            self._pending_write()
+            self._pending_write = None
+
+    def _update_from_values(self, values):
+        """Update state and attributes from the coordinator's extracted values."""
+        if self._sensor_type not in values:
+            return
+
+        value, source = values[self._sensor_type]
+
+        if value is not None:
+            self._state = value
+            self._attributes["data_source"] = source
+
+            # Parsed values keep the string WhatPulse formatted them as
+            if self._sensor_type in self.coordinator.formatted:
+                self._attributes["formatted"] = self.coordinator.formatted[self._sensor_type]
+
+
+class WhatPulseProfileSensor(CoordinatorEntity, SensorEntity):
+    """Account metadata (last pulse, ranks, team) shared by all WhatPulse sensors."""
+
+    def __init__(self, coordinator):
+        """Initialize the profile sensor."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._state, self._attributes = coordinator.profile
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return "WhatPulse Profile"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"whatpulse_{self._api._userid or self._api._username}_profile"
+
+    @property
+    def state(self):
+        """Return the time of the last pulse."""
+        return self._state
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return "mdi:account-circle"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return self._attributes
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Handle updated data from the coordinator, writing state only on change."""
+        state, attributes = self.coordinator.profile
+
+        # Keep the last known metadata while the public API is unavailable
+        if state is None and not attributes:
+            return
+
+        if (state, attributes) == (self._state, self._attributes):
+            return
+
+        self._state, self._attributes = state, attributes
+        self.async_write_ha_state()
+
+
+class WhatPulseHealthSensor(CoordinatorEntity, SensorEntity):
+    """Circuit breaker state of the public or client API endpoint."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _unrecorded_attributes = frozenset(
+        {"seconds_closed", "seconds_open", "seconds_half_open", "retry_in"}
+    )
+
+    def __init__(self, coordinator, source, client_host=None):
+        """Initialize the health sensor."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._source = source
+        self._client_host = client_host
+
+        if source == "public":
+            self._breaker = self._api.public_breaker
+        else:
+            self._breaker = self._api._client.breaker
+
+        self._written = None
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        label = "Public API" if self._source == "public" else "Client API"
+        if self._client_host:
+            return f"WhatPulse {self._client_host} {label} Status"
+        return f"WhatPulse {label} Status"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        if self._client_host:
+            return f"whatpulse_client_{self._client_host}_{self._source}_status"
+        elif self._api._userid or self._api._username:
+            return f"whatpulse_{self._api._userid or self._api._username}_{self._source}_status"
+        else:
+            return f"whatpulse_client_{self._source}_status"
+
+    @property
+    def state(self):
+        """Return the breaker state."""
+        return self._breaker.state
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return "mdi:lan-connect" if self._breaker.state == BREAKER_CLOSED else "mdi:lan-disconnect"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the time spent in each state and the failure count."""
+        durations = self._breaker.state_durations()
+        return {
+            "consecutive_failures": self._breaker.consecutive_failures,
+            "retry_in": self._breaker.retry_in,
+            "seconds_closed": durations[BREAKER_CLOSED],
+            "seconds_open": durations[BREAKER_OPEN],
+            "seconds_half_open": durations[BREAKER_HALF_OPEN],
+        }
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only when the breaker state, failure count or availability changed.
+
+        The durations and retry_in change on every update, so they alone
+        never cause a write.
+        """
+        written = (self.available, self._breaker.state, self._breaker.consecutive_failures)
+        if written == self._written:
+            return
+
+        self._written = written
+        self.async_write_ha_state()
+
+
+class WhatPulseLatencySensor(CoordinatorEntity, SensorEntity):
+    """Rolling p95 latency of API requests or entity updates."""
 
-            # Handle rank sensors specifically
-            if is_rank:
-                if "Ranks" in public_data and self._rank_key in public_data["Ranks"]:
-                    self._state = public_data["Ranks"][self._rank_key]
-                    self._attributes["data_source"] = "public"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _unrecorded_attributes = frozenset({"phases_ms", "last_error", "last_error_at"})
+
+    LABELS = {"public": "Public API", "client": "Client API", "entities": "Entity Update"}
+
+    def __init__(self, coordinator, source, client_host=None):
+        """Initialize the latency sensor."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._source = source
+        self._client_host = client_host
+        self._metrics = async_get_metrics(coordinator.hass)
+
+        if source == "public":
+            self._prefix = PUBLIC_API_URL.split("?", 1)[0]
+        elif source == "client":
+            self._prefix = self._api._client_api_url
+        else:
+            self._prefix = coordinator.entity_metrics_key
+
+        self._written = None
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        if self._client_host:
+            return f"WhatPulse {self._client_host} {self.LABELS[self._source]} Latency"
+        return f"WhatPulse {self.LABELS[self._source]} Latency"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        if self._client_host:
+            return f"whatpulse_client_{self._client_host}_{self._source}_latency"
+        elif self._api._userid or self._api._username:
+            return f"whatpulse_{self._api._userid or self._api._username}_{self._source}_latency"
+        else:
+            return f"whatpulse_client_{self._source}_latency"
+
+    @property
+    def state(self):
+        """Return the p95 of the total duration."""
+        total = self._metrics.summary(self._prefix)["phases_ms"].get("total")
+        return total["p95"] if total else None
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return "ms"
+
+    @property
+    def state_class(self):
+        """Return the state class."""
+        return "measurement"
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return "mdi:timer-outline"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the counters, last error and per-phase percentiles."""
+        return self._metrics.summary(self._prefix)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only when the p95 moved past the deadband, a request failed or availability changed.
+
+        The request counters and the other percentiles change on every
+        update, so they alone never cause a write.
+        """
+        available = self.available
+        p95 = self.state
+        failures = self._metrics.summary(self._prefix)["failures"]
+
+        if self._written is not None:
+            written_available, written_p95, written_failures = self._written
+            if (available, failures) == (written_available, written_failures) and not self._p95_moved(
+                written_p95, p95
+            ):
                 return
 
-            # Update state if no client data or not a client-specific sensor
-            if self._state is None and self._sensor_type in public_data:
-                self._state = public_data[self._sensor_type]
-                self._attributes["data_source"] = "public"
+        self._written = (available, p95, failures)
+        self.async_write_ha_state()
+
+    @staticmethod
+    def _p95_moved(previous, current):
+        """Return True if the p95 appeared, disappeared or changed by at least the deadband."""
+        if previous is None or current is None:
+            return previous != current
+        return abs(current - previous) >= LATENCY_DEADBAND
+
+
+class WhatPulseFleetSensor(SensorEntity):
+    """Sum of one client sensor across every client in a fleet."""
+
+    _attr_should_poll = False
+
+    def __init__(self, coordinators, sensor_type):
+        """Initialize the fleet sensor."""
+        self._coordinators = coordinators
+        self._sensor_type = sensor_type
+        self._sensor_info = SENSOR_TYPES[sensor_type]
+        self._state = None
+        self._attributes = {}
+        self._recompute()
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"WhatPulse Fleet {self._sensor_info['name']}"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"whatpulse_fleet_{self._sensor_type}"
+
+    @property
+    def state(self):
+        """Return the fleet-wide total."""
+        return self._state
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return self._sensor_info["unit"]
+
+    @property
+    def state_class(self):
+        """Return the state class."""
+        return self._sensor_info.get("state_class")
+
+    @property
+    def device_class(self):
+        """Return the device class."""
+        return self._sensor_info.get("device_class")
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return self._sensor_info["icon"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return self._attributes
+
+    async def async_added_to_hass(self):
+        """Subscribe to every client's coordinator."""
+        for coordinator in self._coordinators:
+            self.async_on_remove(coordinator.async_add_listener(self._handle_coordinator_update))
+
+    def _recompute(self):
+        """Sum the latest value of every reachable client in memory."""
+        total = 0
+        reporting = 0
+        for coordinator in self._coordinators:
+            value, _ = coordinator.values.get(self._sensor_type, (None, None))
+            try:
+                total += float(value)
+            except (TypeError, ValueError):
+                continue
+            reporting += 1
+
+        self._state = round(total, 2) if reporting else None
+        self._attributes = {
+            "clients_reporting": reporting,
+            "clients_total": len(self._coordinators),
+        }
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Recompute the total when any client reports new data."""
+        previous = (self._state, self._attributes)
+        self._recompute()
 
-            # Update attributes
-            if "LastPulse" in public_data:
-                self._attributes["last_pulse"] = public_data["LastPulse"]
+        if (self._state, self._attributes) != previous:
+            self.async_write_ha_state()
 
-            if "LastPulseUnixTimestamp" in public_data:
-                self._attributes["last_pulse_timestamp"] = public_data["LastPulseUnixTimestamp"]
 
-            if self._rank_key and "Ranks" in public_data and self._rank_key in public_data["Ranks"]:
-                self._attributes["rank"] = public_data["Ranks"][self._rank_key]
+class WhatPulseTeamMemberSensor(CoordinatorEntity, SensorEntity):
+    """One counter of one member of a WhatPulse team."""
+
+    def __init__(self, coordinator, member_id, sensor_type):
+        """Initialize the team member sensor."""
+        super().__init__(coordinator)
+        self._member_id = member_id
+        self._sensor_type = sensor_type
+        self._sensor_info = SENSOR_TYPES[sensor_type]
+        self._member_name = member_id
+        self._state = None
+        self._written_available = None
+        self._update_from_members()
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"WhatPulse {self._member_name} {self._sensor_info['name']}"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"whatpulse_team_{slugify(self.coordinator.api.team)}_{self._member_id}_{self._sensor_type}"
+
+    @property
+    def available(self):
+        """Return True while the member is still in the team."""
+        return super().available and self._member_id in self.coordinator.members
+
+    @property
+    def state(self):
+        """Return the state of the sensor."""
+        return self._state
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return self._sensor_info["unit"]
+
+    @property
+    def state_class(self):
+        """Return the state class."""
+        return self._sensor_info.get("state_class")
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return self._sensor_info["icon"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes."""
+        return {"team": self.coordinator.api.team, "username": self._member_name}
+
+    def _update_from_members(self):
+        """Update the state from the coordinator's members."""
+        member = self.coordinator.members.get(self._member_id)
+        if member:
+            self._member_name = member["name"]
+            self._state = member["values"].get(self._sensor_type)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only for members whose numbers or availability changed."""
+        available = self.available
+        if available == self._written_available and self._member_id not in self.coordinator.changed_members:
+            return
+
+        self._written_available = available
+        self._update_from_members()
+        self.async_write_ha_state()
+
+
+class WhatPulseTeamLeaderboardSensor(CoordinatorEntity, SensorEntity):
+    """Members of a WhatPulse team ranked by one counter."""
+
+    _unrecorded_attributes = frozenset({"leaderboard"})
+
+    def __init__(self, coordinator):
+        """Initialize the leaderboard sensor."""
+        super().__init__(coordinator)
+        self._written_available = None
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"WhatPulse Team {self.coordinator.api.team} Leaderboard"
+
+    @property
+    def unique_id(self):
+        """Return a unique ID."""
+        return f"whatpulse_team_{slugify(self.coordinator.api.team)}_leaderboard"
+
+    @property
+    def state(self):
+        """Return the name of the member in first place."""
+        if not self.coordinator.leaderboard:
+            return None
+        return self.coordinator.leaderboard[0][1]
+
+    @property
+    def icon(self):
+        """Return the icon to use in the frontend."""
+        return "mdi:podium"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the ranking."""
+        return {
+            "rank_by": self.coordinator.rank_by,
+            "leaderboard": [
+                {"rank": rank, "username": name, "user_id": member_id, "value": value}
+                for rank, (value, name, member_id) in enumerate(self.coordinator.leaderboard, start=1)
+            ],
+        }
 
-            # Add team information if available
-            if "Team" in public_data:
-                team = public_data["Team"]
-                if "Name" in team:
-                    self._attributes["team_name"] = team["Name"]
+    @callback
+    def _handle_coordinator_update(self):
+        """Write state only when the ranking, its numbers or availability changed."""
+        available = self.available
+        if available == self._written_available and not self.coordinator.leaderboard_changed:
+            return
 
-                if "Ranks" in team and self._rank_key and self._rank_key in team["Ranks"]:
-                    self._attributes["team_rank"] = team["Ranks"][self._rank_key]
\ No newline at end of file
+        self._written_available = available
+        self.async_write_ha_state()
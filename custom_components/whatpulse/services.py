@@ -1,13 +1,20 @@
 """WhatPulse services."""
 import logging
 import voluptuous as vol
-import requests
 
 import homeassistant.helpers.config_validation as cv
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
 
+from .api import async_get_client
+from .backfill import WhatPulseBackfill
+from .diagnostics import async_get_diagnostics
 from .const import (
+    DATA_APIS,
     DOMAIN,
+    SERVICE_BACKFILL_HISTORY,
+    SERVICE_DUMP_DIAGNOSTICS,
     CONF_CLIENT_API_URL,
     CONF_API_TYPE,
     API_TYPE_CLIENT,
@@ -23,6 +30,14 @@ PROFILE_SERVICE_SCHEMA = vol.Schema(
     }
 )
 
+BACKFILL_SERVICE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("user"): cv.string,
+        vol.Optional("start"): cv.date,
+        vol.Optional("restart", default=False): cv.boolean,
+    }
+)
+
 def setup_services(hass: HomeAssistant, config_entry):
     """Set up services for the WhatPulse integration."""
     client_api_url = config_entry.get(CONF_CLIENT_API_URL)
@@ -40,26 +55,84 @@ def setup_services(hass: HomeAssistant, config_entry):
             _LOGGER.error("No client API URL provided")
             return
 
-        try:
-            response = requests.post(
-                f"{url}/v1/profiles/activate",
-                json={"profile_id": profile_id},
-                timeout=10
-            )
-
-            if response.status_code != 200:
-                _LOGGER.error(f"Failed to activate profile {profile_id}: {response.status_code}, {response.text}")
-                return
-
-            _LOGGER.info(f"Successfully activated profile ID: {profile_id}")
+        client = async_get_client(hass, url)
+        if not await client.async_post("/v1/profiles/activate", {"profile_id": profile_id}):
+            _LOGGER.error(f"Failed to activate profile {profile_id}")
+            return
 
-        except Exception as ex:
-            _LOGGER.error(f"Error activating profile {profile_id}: {ex}")
+        _LOGGER.info(f"Successfully activated profile ID: {profile_id}")
 
     # Register the service
-    hass.services.register(
+    hass.services.async_register(
         DOMAIN,
         "activate_profile",
         activate_profile,
         schema=PROFILE_SERVICE_SCHEMA
-    )
\ No newline at end of file
+    )
+
+def async_setup_backfill_service(hass: HomeAssistant):
+    """Set up the history backfill service for users polled via the public API."""
+    if hass.services.has_service(DOMAIN, SERVICE_BACKFILL_HISTORY):
+        return
+
+    running = set()
+
+    async def backfill_history(call: ServiceCall):
+        """Import a user's pulse history as long-term statistics."""
+        if "recorder" not in hass.config.components:
+            raise HomeAssistantError("Backfilling WhatPulse history requires the recorder integration")
+
+        apis = hass.data.get(DOMAIN, {}).get(DATA_APIS, {})
+        user = call.data.get("user")
+        if user is None and len(apis) == 1:
+            user = next(iter(apis))
+
+        if user not in apis:
+            raise HomeAssistantError(f"Unknown WhatPulse user {user}, choose one of: {', '.join(apis)}")
+
+        if user in running:
+            raise HomeAssistantError(f"A backfill for WhatPulse user {user} is already running")
+
+        start = None
+        if "start" in call.data:
+            start = dt_util.as_timestamp(dt_util.start_of_local_day(call.data["start"]))
+
+        backfill = WhatPulseBackfill(hass, apis[user], user)
+
+        async def run():
+            running.add(user)
+            try:
+                await backfill.async_run(start, call.data["restart"])
+            except HomeAssistantError as ex:
+                _LOGGER.error(str(ex))
+            finally:
+                running.discard(user)
+
+        # Paging through years of history takes a while, so do not block the caller
+        hass.async_create_background_task(run(), f"{DOMAIN} backfill {user}")
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_HISTORY,
+        backfill_history,
+        schema=BACKFILL_SERVICE_SCHEMA
+    )
+
+
+def async_setup_diagnostics_service(hass: HomeAssistant):
+    """Set up the service dumping poller state and request percentiles."""
+    if hass.services.has_service(DOMAIN, SERVICE_DUMP_DIAGNOSTICS):
+        return
+
+    async def dump_diagnostics(call: ServiceCall):
+        """Log the diagnostics and return them to the caller."""
+        diagnostics = async_get_diagnostics(hass)
+        _LOGGER.info(f"WhatPulse diagnostics: {diagnostics}")
+        return diagnostics
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_DIAGNOSTICS,
+        dump_diagnostics,
+        supports_response=SupportsResponse.OPTIONAL
+    )
@@ -0,0 +1,140 @@
+"""Bulk import of WhatPulse counters as long-term statistics."""
+
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WhatPulseStatisticsImporter:
+    """Aggregate counter samples in memory and import them hourly in bulk.
+
+    Only the last sample of every hour is kept per counter. Once an hour is
+    complete, all counters are imported through the recorder's external
+    statistics API in one batch per counter. Lifetime counters double as
+    their sum; the unpulsed counters drop back to zero on every pulse, so
+    their sum adds up the input across pulses instead.
+    """
+
+    def __init__(self, hass, statistic_prefix, sensor_types, sensor_definitions):
+        """Initialize the importer for the counters among the sensors."""
+        self._hass = hass
+        self._statistic_prefix = slugify(statistic_prefix)
+        self._sensors = {
+            sensor_type: sensor_definitions[sensor_type]
+            for sensor_type in sensor_types
+            if sensor_definitions[sensor_type].get("state_class") == "total_increasing"
+        }
+        self._resetting = {
+            sensor_type
+            for sensor_type, sensor_info in self._sensors.items()
+            if (sensor_info["client_path"] or [None])[0] == "unpulsed"
+        }
+        self._pending = {sensor_type: {} for sensor_type in self._sensors}
+        self._current_hour = None
+        self._last_states = {}
+        self._sums = {}
+
+    def __bool__(self):
+        """Return True if any counter is imported."""
+        return bool(self._sensors)
+
+    def __contains__(self, sensor_type):
+        """Return True if a counter is imported."""
+        return sensor_type in self._sensors
+
+    async def async_load(self):
+        """Continue the sums of the unpulsed counters from their last import."""
+        for sensor_type in self._resetting:
+            statistic_id = self.statistic_id(sensor_type)
+            last = await get_instance(self._hass).async_add_executor_job(
+                get_last_statistics, self._hass, 1, statistic_id, False, {"state", "sum"}
+            )
+            if not last.get(statistic_id):
+                continue
+
+            row = last[statistic_id][0]
+            if row.get("state") is not None and row.get("sum") is not None:
+                self._last_states[sensor_type] = row["state"]
+                self._sums[sensor_type] = row["sum"]
+
+    def statistic_id(self, sensor_type):
+        """Return the external statistic id of a counter."""
+        return f"{DOMAIN}:{self._statistic_prefix}_{slugify(sensor_type)}"
+
+    def metadata(self, sensor_type):
+        """Return the statistic metadata of a counter."""
+        sensor_info = self._sensors[sensor_type]
+        return StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"WhatPulse {sensor_info['name']}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id(sensor_type),
+            unit_of_measurement=sensor_info["unit"] or None,
+        )
+
+    def add_sample(self, timestamp, values):
+        """Record the latest counter values, importing completed hours."""
+        hour = dt_util.utc_from_timestamp(timestamp).replace(minute=0, second=0, microsecond=0)
+
+        for sensor_type in self._sensors:
+            value, _ = values.get(sensor_type, (None, None))
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+
+            self._pending[sensor_type][hour] = (value, self._sum(sensor_type, value))
+
+        if self._current_hour is not None and hour > self._current_hour:
+            self._async_import(before=hour)
+        self._current_hour = hour
+
+    def _sum(self, sensor_type, value):
+        """Return the sum of a counter after a new sample."""
+        if sensor_type not in self._resetting:
+            return value
+
+        total = self._sums.get(sensor_type, 0.0)
+        last_state = self._last_states.get(sensor_type)
+        if last_state is not None:
+            # After a pulse, all of the new value is new input
+            total += value if value < last_state else value - last_state
+
+        self._last_states[sensor_type] = value
+        self._sums[sensor_type] = total
+        return total
+
+    def _async_import(self, before):
+        """Import every pending hour that started before the given one."""
+        for sensor_type, hours in self._pending.items():
+            completed = sorted(start for start in hours if start < before)
+            if not completed:
+                continue
+
+            statistics = [
+                StatisticData(start=start, state=hours[start][0], sum=hours[start][1])
+                for start in completed
+            ]
+            for start in completed:
+                del hours[start]
+
+            self.async_import_hourly(sensor_type, statistics)
+
+    def async_import_hourly(self, sensor_type, statistics):
+        """Import a batch of hourly statistics for a counter."""
+        _LOGGER.debug(
+            "Importing %s hourly statistics for %s up to %s",
+            len(statistics), self.statistic_id(sensor_type), statistics[-1]["start"],
+        )
+        async_add_external_statistics(self._hass, self.metadata(sensor_type), statistics)
@@ -0,0 +1,99 @@
+"""Streaming of WhatPulse realtime stats at sub-second resolution."""
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WhatPulseRealtimeStream:
+    """Sample the realtime subtree continuously and publish it at a capped rate.
+
+    The client API has no push channel, so the stream polls the narrow
+    realtime endpoint over the shared keep-alive session. Samples are
+    coalesced: only the latest one is published, at most once per publish
+    interval, so the state machine and recorder see a bounded write rate
+    however fast the client is sampled.
+    """
+
+    def __init__(self, hass, coordinator, poll_interval, max_rate):
+        """Initialize the stream for a coordinator's client."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._api = coordinator.api
+        self._poll_interval = poll_interval
+        self._publish_interval = timedelta(seconds=1 / max_rate)
+        self._latest = None
+        self._latest_fetched = None
+        self._task = None
+        self._unsub_publish = None
+        self._unsub_stop = None
+        self.samples = 0
+        self.published = 0
+
+    @callback
+    def async_start(self):
+        """Start sampling and publishing."""
+        # The stream replaces the coordinator's polling of the realtime subtree
+        self._api.set_streamed_subtree("realtime")
+
+        self._task = self._hass.async_create_background_task(
+            self._async_sample(), f"{DOMAIN} realtime stream {self._api._client_api_url}"
+        )
+        self._unsub_publish = async_track_time_interval(
+            self._hass, self._async_publish, self._publish_interval
+        )
+        self._unsub_stop = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+
+    @callback
+    def async_stop(self):
+        """Stop sampling and publishing."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._unsub_publish:
+            self._unsub_publish()
+            self._unsub_publish = None
+        if self._unsub_stop:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    @callback
+    def _async_handle_stop(self, _event):
+        """Stop when Home Assistant stops."""
+        self._unsub_stop = None
+        self.async_stop()
+
+    async def _async_sample(self):
+        """Fetch the realtime subtree over and over, keeping the latest sample."""
+        client = self._api._client
+
+        while True:
+            data = await self._api._request_update_client_subtree("realtime")
+            if data:
+                self._latest = data
+                self._latest_fetched = datetime.now().timestamp()
+                self.samples += 1
+                await asyncio.sleep(self._poll_interval)
+            else:
+                # Wait for the breaker to allow the next probe
+                await asyncio.sleep(max(self._poll_interval, client.breaker.retry_in))
+
+    @callback
+    def _async_publish(self, _now):
+        """Hand the latest sample, if new, to the coordinator's entities."""
+        if self._latest is None:
+            return
+
+        latest, self._latest = self._latest, None
+        self.published += 1
+        self._coordinator.async_set_client_subtree("realtime", latest, self._latest_fetched)
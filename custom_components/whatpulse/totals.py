@@ -0,0 +1,84 @@
+"""Live lifetime totals reconciled from pulsed totals and unpulsed counters."""
+
+from .const import LIVE_TOTALS
+from .parsing import as_float
+
+
+class LiveTotals:
+    """Report lifetime totals that include the input not yet pulsed.
+
+    The live total is the pulsed total (the higher of the public total and
+    the client's account totals) plus the client's unpulsed counter. When a
+    pulse resets the unpulsed counter before either pulsed total includes
+    it, the pre-pulse count is carried until a pulsed total catches up.
+    When a pulsed total includes a pulse before the unpulsed counter is
+    reset, the increase is taken off the unpulsed count until the reset.
+    Either way the live total neither dips nor counts a pulse twice.
+    """
+
+    def __init__(self, sensor_types):
+        """Initialize the reconciler for the configured totals sensors."""
+        self._channels = {
+            sensor_type: channel
+            for sensor_type, channel in LIVE_TOTALS.items()
+            if sensor_type in sensor_types
+        }
+        self._state = {
+            sensor_type: {"base": None, "unpulsed": 0.0, "carried": 0.0, "overlap": 0.0}
+            for sensor_type in self._channels
+        }
+
+    def __bool__(self):
+        """Return True if any totals sensor is reconciled."""
+        return bool(self._channels)
+
+    def values(self, data):
+        """Return {sensor_type: (value, data_source)} for the reconciled totals."""
+        client_data = data.get("client") or {}
+        public_data = data.get("public") or {}
+        unpulsed_data = client_data.get("unpulsed") or {}
+        totals_data = client_data.get("account-totals") or {}
+
+        values = {}
+        for sensor_type, channel in self._channels.items():
+            unpulsed = as_float(unpulsed_data.get(channel))
+            pulsed = [
+                total
+                for total in (as_float(public_data.get(sensor_type)), as_float(totals_data.get(channel)))
+                if total is not None
+            ]
+            if unpulsed is None or not pulsed:
+                continue
+
+            state = self._state[sensor_type]
+
+            # Lifetime totals never decrease, so a pulsed total falling back
+            # (such as a stale source) is ignored
+            base = max(pulsed)
+            increase = 0.0
+            if state["base"] is not None:
+                increase = max(base - state["base"], 0.0)
+                base = max(base, state["base"])
+
+            if unpulsed < state["unpulsed"]:
+                # A pulse took the unpulsed count with it; the part not
+                # known to be in the pulsed totals yet is carried
+                state["carried"] += state["unpulsed"] - state["overlap"]
+                state["overlap"] = 0.0
+
+            if increase:
+                if state["carried"]:
+                    # The carried pulse reached the pulsed totals
+                    state["carried"] = max(state["carried"] - increase, 0.0)
+                else:
+                    # A pulse that reached the pulsed totals before the
+                    # unpulsed counter was reset is in both until the reset
+                    state["overlap"] = min(state["overlap"] + increase, unpulsed)
+
+            state["base"] = base
+            state["unpulsed"] = unpulsed
+
+            live = base + state["carried"] + unpulsed - state["overlap"]
+            values[sensor_type] = (int(live), "live")
+
+        return values
@@ -0,0 +1,40 @@
+"""Fixtures for the WhatPulse tests."""
+
+import pytest
+
+from benchmarks.fake_servers import FakeWhatPulseClient, FakeWhatPulsePublicAPI
+from custom_components.whatpulse import api as whatpulse_api
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Allow loading the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+def expected_lingering_timers():
+    """YAML platforms keep their coordinators' refresh timers until shutdown."""
+    return True
+
+
+@pytest.fixture
+async def fake_client(socket_enabled):
+    """Serve the client API of virtual WhatPulse clients.
+
+    The stand-in servers listen on 127.0.0.1, so sockets are allowed.
+    """
+    server = await FakeWhatPulseClient().async_start()
+    yield server
+    await server.async_stop()
+
+
+@pytest.fixture
+async def fake_public(socket_enabled, monkeypatch):
+    """Serve a fake api.whatpulse.org and point the integration at it."""
+    server = await FakeWhatPulsePublicAPI().async_start()
+    monkeypatch.setattr(whatpulse_api, "PUBLIC_API_URL", f"{server.url}/user.php?")
+    monkeypatch.setattr(whatpulse_api, "PUBLIC_PULSES_API_URL", f"{server.url}/pulses.php?")
+    monkeypatch.setattr(whatpulse_api, "PUBLIC_TEAM_API_URL", f"{server.url}/team.php?")
+    yield server
+    await server.async_stop()
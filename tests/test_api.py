@@ -0,0 +1,106 @@
+"""Tests for the WhatPulse API poller."""
+
+from datetime import timedelta
+import time
+
+from homeassistant.setup import async_setup_component
+
+from custom_components.whatpulse.const import (
+    DATA_COORDINATORS,
+    DOMAIN,
+    PUBLIC_REFRESH_RATE,
+    PUBLIC_RETRY_RATE,
+    STORAGE_VERSION,
+)
+
+PUBLIC_LATENCY = 3
+
+
+async def test_slow_public_api_does_not_hold_back_client(hass, fake_public, fake_client):
+    """With both APIs, client data is published while the public API is still answering."""
+    fake_public.latency = PUBLIC_LATENCY
+
+    start = time.monotonic()
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": [
+                {
+                    "platform": DOMAIN,
+                    "userid": "1",
+                    "api_type": "both",
+                    "client_api_url": fake_client.client_url(0),
+                    "sensors": ["RealtimeKeys", "UnpulsedKeys", "Pulses"],
+                }
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+    assert time.monotonic() - start < PUBLIC_LATENCY / 2
+
+    coordinator = hass.data[DOMAIN][DATA_COORDINATORS][0]
+    public_task = coordinator.api._public_task
+    assert public_task is not None
+    assert hass.states.get("sensor.whatpulse_realtime_keys").state == "1.23"
+    unpulsed_keys = int(hass.states.get("sensor.whatpulse_unpulsed_keys").state)
+    assert hass.states.get("sensor.whatpulse_pulses").state == "unknown"
+
+    # The next client refresh is not held back by the public request either
+    coordinator.api._last_refresh_client.clear()
+    start = time.monotonic()
+    await coordinator.async_refresh()
+    assert time.monotonic() - start < PUBLIC_LATENCY / 2
+    assert not public_task.done()
+    assert int(hass.states.get("sensor.whatpulse_unpulsed_keys").state) > unpulsed_keys
+
+    # Once the public API answers, its data is pushed to the entities
+    await public_task
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.whatpulse_pulses").state == "4321"
+    assert fake_public.total_requests() == 1
+
+
+async def test_failed_public_refresh_is_retried_soon(hass, fake_public):
+    """A failed public refresh is retried at the retry rate instead of a period later."""
+    assert await async_setup_component(
+        hass, "sensor", {"sensor": [{"platform": DOMAIN, "userid": "1", "sensors": ["Keys"]}]}
+    )
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][DATA_COORDINATORS][0]
+    assert coordinator.update_interval > timedelta(seconds=PUBLIC_RETRY_RATE)
+
+    await fake_public.async_stop()
+    coordinator.api._next_refresh_public = 0
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=PUBLIC_RETRY_RATE)
+    assert hass.states.get("sensor.whatpulse_keys").state == "12345678"
+
+
+async def test_cached_public_payload_counts_against_the_schedule(hass, hass_storage, fake_public):
+    """A restored public payload is refreshed once it expires, not a whole period after startup."""
+    expires_in = 600
+    hass_storage[f"{DOMAIN}.1"] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": f"{DOMAIN}.1",
+        "data": {
+            "public": {
+                "data": fake_public.user_payload("1"),
+                "fetched": time.time() - PUBLIC_REFRESH_RATE + expires_in,
+                "validators": {},
+            }
+        },
+    }
+
+    assert await async_setup_component(
+        hass, "sensor", {"sensor": [{"platform": DOMAIN, "userid": "1", "sensors": ["Keys"]}]}
+    )
+    await hass.async_block_till_done()
+
+    assert fake_public.total_requests() == 0
+    assert hass.states.get("sensor.whatpulse_keys").state == "12345678"
+
+    coordinator = hass.data[DOMAIN][DATA_COORDINATORS][0]
+    assert coordinator.update_interval <= timedelta(seconds=expires_in)
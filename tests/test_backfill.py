@@ -0,0 +1,62 @@
+"""Tests for the pulse history backfill."""
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.components.recorder.common import async_wait_recording_done
+
+from custom_components.whatpulse import backfill
+from custom_components.whatpulse.const import DATA_APIS, DOMAIN, SERVICE_BACKFILL_HISTORY
+
+LIFETIME_KEYS = 12345678
+PULSE_KEYS = 1234
+
+
+async def _async_keys_sums(hass):
+    """Return the imported hourly sums of the keys statistic."""
+    statistic_id = f"{DOMAIN}:1_keys"
+    statistics = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.utc_from_timestamp(0),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"sum"},
+    )
+    return [row["sum"] for row in statistics.get(statistic_id, [])]
+
+
+async def test_backfill_history(recorder_mock, hass, fake_public, monkeypatch):
+    """Pulses are imported as lifetime totals ending at the current lifetime total."""
+    monkeypatch.setattr(backfill, "BACKFILL_PAGE_DELAY", 0)
+
+    assert await async_setup_component(
+        hass, "sensor", {"sensor": [{"platform": DOMAIN, "userid": "1", "sensors": ["Keys"]}]}
+    )
+    await hass.async_block_till_done()
+
+    # 40 days of pulses, every 6 hours, take two pages
+    api = hass.data[DOMAIN][DATA_APIS]["1"]
+    last_pulse = float(api._data["public"]["LastPulseUnixTimestamp"])
+    start = dt_util.as_local(dt_util.utc_from_timestamp(last_pulse - 40 * 86400)).date()
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_BACKFILL_HISTORY, {"start": start.isoformat()}, blocking=True
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+    await async_wait_recording_done(hass)
+
+    assert fake_public.requests["/pulses.php"] == 2
+
+    sums = await _async_keys_sums(hass)
+    assert len(sums) >= 40 * 4
+    assert sums[-1] == LIFETIME_KEYS
+    assert all(later - earlier == PULSE_KEYS for earlier, later in zip(sums, sums[1:]))
+
+    # A finished backfill has nothing left to resume
+    await hass.services.async_call(DOMAIN, SERVICE_BACKFILL_HISTORY, {}, blocking=True)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert fake_public.requests["/pulses.php"] == 2
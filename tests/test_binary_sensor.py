@@ -0,0 +1,32 @@
+"""Tests for the WhatPulse rule binary sensors."""
+
+from homeassistant.setup import async_setup_component
+
+from custom_components.whatpulse.const import DOMAIN
+
+
+async def test_rules_keep_user_binary_sensors(hass, fake_client):
+    """Rules are exposed as binary sensors next to the user's own binary sensors."""
+    config = {
+        "sensor": [
+            {
+                "platform": DOMAIN,
+                "api_type": "client",
+                "client_api_url": fake_client.client_url(0),
+                "sensors": ["RealtimeKeys"],
+                "rules": [
+                    {"name": "Typing", "sensor": "UnpulsedKeys", "above": 0},
+                    {"name": "Idle", "sensor": "RealtimeKeys", "below": 0.5},
+                ],
+            }
+        ],
+        "binary_sensor": [
+            {"platform": "template", "sensors": {"always_on": {"value_template": "{{ true }}"}}}
+        ],
+    }
+    assert await async_setup_component(hass, "sensor", config)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("binary_sensor.whatpulse_typing").state == "on"
+    assert hass.states.get("binary_sensor.whatpulse_idle").state == "off"
+    assert hass.states.get("binary_sensor.always_on").state == "on"
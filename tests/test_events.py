@@ -0,0 +1,36 @@
+"""Tests for the pulse, milestone and rank change events."""
+
+import time
+
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.whatpulse.const import EVENT_PULSE
+from custom_components.whatpulse.events import WhatPulseEventDetector
+
+
+def _snapshot(unpulsed_keys, last_pulse):
+    """Return a snapshot with the given unpulsed keys and public last pulse."""
+    return {
+        "client": {"unpulsed": {"keys": unpulsed_keys}},
+        "public": {"LastPulseUnixTimestamp": str(int(last_pulse))},
+    }
+
+
+async def test_public_pulse_of_another_computer_is_not_taken_for_the_client_pulse(hass):
+    """Only a public last pulse at the time of the client's reset confirms it."""
+    events = async_capture_events(hass, EVENT_PULSE)
+    detector = WhatPulseEventDetector(hass, "1")
+    now = time.time()
+
+    detector.async_process(_snapshot(50, now - 3600), {})
+    detector.async_process(_snapshot(0, now - 3600), {})
+
+    # Another computer pulsed before the client did
+    detector.async_process(_snapshot(10, now - 600), {})
+
+    # The client's own pulse reaches the public API
+    detector.async_process(_snapshot(20, now), {})
+    await hass.async_block_till_done()
+
+    assert [event.data["source"] for event in events] == ["client", "public"]
+    assert events[1].data["timestamp"] == int(now - 600)
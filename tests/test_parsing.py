@@ -0,0 +1,133 @@
+"""Tests for parsing WhatPulse's formatted values."""
+
+import random
+import string
+
+import pytest
+
+from custom_components.whatpulse.parsing import (
+    PARSERS,
+    normalize_values,
+    parse_duration,
+    parse_rate,
+    parse_size,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("4.36TB", 4571791.36),
+        ("554.58GB", 567889.92),
+        ("1,024MB", 1024),
+        ("512 KB", 0.5),
+        ("1048576B", 1),
+        ("2 GiB", 2048),
+        ("0MB", 0),
+        (" 1.5gb ", 1536),
+    ],
+)
+def test_parse_size(text, expected):
+    """Sizes are returned in megabytes."""
+    assert parse_size(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("12.5KB/s", 12.5),
+        ("1.25MB/s", 1280),
+        ("512B/s", 0.5),
+        ("0KB/s", 0),
+    ],
+)
+def test_parse_rate(text, expected):
+    """Rates are returned in kB/s."""
+    assert parse_rate(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("3d4h", 3 * 86400 + 4 * 3600),
+        ("3y7w2d3h", 3 * 365 * 86400 + 7 * 7 * 86400 + 2 * 86400 + 3 * 3600),
+        ("3 years, 7 weeks, 2 days, 3 hours", 3 * 365 * 86400 + 7 * 7 * 86400 + 2 * 86400 + 3 * 3600),
+        ("1 hour and 5 minutes", 3900),
+        ("45s", 45),
+        ("2 Days", 172800),
+    ],
+)
+def test_parse_duration(text, expected):
+    """Durations are returned in seconds."""
+    assert parse_duration(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "abc", "1e3MB", "MB", "1.2.3MB", "-5MB", "12XB", "1 month", "5 lightyears", "3d junk 4h", "kbps"],
+)
+def test_rejects(text):
+    """Anything that is not a plain size, rate or duration is rejected."""
+    for parser in PARSERS.values():
+        assert parser(text) is None
+
+
+def test_normalize_values():
+    """Parsed values replace the strings, which are returned as formatted."""
+    values = {"Download": ("4.36TB", "public"), "Keys": (123, "public"), "Upload": ("oops", "public")}
+    formatted = normalize_values(values, {"Download": parse_size, "Upload": parse_size})
+
+    assert values == {
+        "Download": (pytest.approx(4571791.36), "public"),
+        "Keys": (123, "public"),
+        "Upload": (None, "public"),
+    }
+    assert formatted == {"Download": "4.36TB", "Upload": "oops"}
+
+
+def test_fuzz_random_input():
+    """Random input never raises and only yields non-negative numbers or None."""
+    rng = random.Random(17)
+    alphabet = string.digits * 3 + ".,/ " + "kmgtpbiKMGTPBIydhwsand" + string.punctuation
+
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+        for parser in PARSERS.values():
+            # Bypass the cache so every input is really parsed
+            value = parser.__wrapped__(text)
+            assert value is None or value >= 0, text
+
+
+def test_fuzz_round_trip():
+    """Randomly formatted sizes and durations parse back to their value."""
+    rng = random.Random(42)
+    size_units = {"B": 1 / 1024 ** 2, "KB": 1 / 1024, "MB": 1, "GB": 1024, "TB": 1024 ** 2}
+    duration_units = {"y": 365 * 86400, "w": 7 * 86400, "d": 86400, "h": 3600, "m": 60, "s": 1}
+
+    for _ in range(5000):
+        number = round(rng.uniform(0, 10000), rng.randint(0, 2))
+        unit = rng.choice(list(size_units))
+        space = rng.choice(["", " "])
+        assert parse_size.__wrapped__(f"{number}{space}{unit}") == pytest.approx(
+            number * size_units[unit], abs=1e-3
+        )
+        assert parse_rate.__wrapped__(f"{number}{space}{unit}/s") == pytest.approx(
+            number * size_units[unit] * 1024, abs=1e-3
+        )
+
+        parts = rng.sample(list(duration_units), rng.randint(1, len(duration_units)))
+        counts = [rng.randint(0, 99) for _ in parts]
+        text = "".join(f"{count}{unit}" for count, unit in zip(counts, parts))
+        assert parse_duration.__wrapped__(text) == sum(
+            count * duration_units[unit] for count, unit in zip(counts, parts)
+        )
+
+
+def test_repeated_strings_are_cached():
+    """The same string is only parsed once."""
+    parse_size.cache_clear()
+    for _ in range(100):
+        parse_size("4.36TB")
+
+    info = parse_size.cache_info()
+    assert (info.hits, info.misses) == (99, 1)
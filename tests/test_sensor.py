@@ -0,0 +1,101 @@
+"""Tests for setting up the WhatPulse sensor platform."""
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.setup import async_setup_component
+
+from custom_components.whatpulse.const import (
+    DATA_COORDINATORS,
+    DOMAIN,
+    SERVICE_BACKFILL_HISTORY,
+    SERVICE_DUMP_DIAGNOSTICS,
+)
+
+
+async def test_setup_public(hass, fake_public):
+    """The default public configuration creates its sensors and services."""
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {"sensor": [{"platform": DOMAIN, "userid": "1", "sensors": ["Keys", "Download"]}]},
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.whatpulse_keys").state == "12345678"
+    assert float(hass.states.get("sensor.whatpulse_download").state) > 0
+    assert hass.states.get("sensor.whatpulse_profile") is not None
+    assert hass.services.has_service(DOMAIN, SERVICE_BACKFILL_HISTORY)
+    assert hass.services.has_service(DOMAIN, SERVICE_DUMP_DIAGNOSTICS)
+
+
+async def test_setup_both(hass, fake_public, fake_client):
+    """Public and client data are combined into one set of sensors."""
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": [
+                {
+                    "platform": DOMAIN,
+                    "userid": "1",
+                    "api_type": "both",
+                    "client_api_url": fake_client.client_url(0),
+                    "sensors": ["Keys", "UnpulsedKeys", "RealtimeDownload"],
+                }
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+
+    # The live total includes the keys not pulsed yet
+    assert float(hass.states.get("sensor.whatpulse_keys").state) > 12345678
+    assert hass.states.get("sensor.whatpulse_unpulsed_keys").state != "unknown"
+    assert float(hass.states.get("sensor.whatpulse_realtime_download").state) == 12.5
+
+
+async def test_setup_client(hass, fake_client):
+    """A client-only configuration needs no user."""
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": [
+                {
+                    "platform": DOMAIN,
+                    "api_type": "client",
+                    "client_api_url": fake_client.client_url(0),
+                    "sensors": ["UnpulsedKeys"],
+                }
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.whatpulse_unpulsed_keys").state != "unknown"
+    assert not hass.services.has_service(DOMAIN, SERVICE_BACKFILL_HISTORY)
+
+
+async def test_unavailable_state_is_written(hass, fake_client):
+    """A failed update is written even though the sensor's value did not change."""
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": [
+                {
+                    "platform": DOMAIN,
+                    "api_type": "client",
+                    "client_api_url": fake_client.client_url(0),
+                    "sensors": ["RealtimeKeys"],
+                }
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.whatpulse_realtime_keys").state == "1.23"
+
+    coordinator = hass.data[DOMAIN][DATA_COORDINATORS][0]
+    coordinator.async_set_update_error(UpdateFailed("Client unreachable"))
+    assert hass.states.get("sensor.whatpulse_realtime_keys").state == "unavailable"
+
+    coordinator.async_set_updated_data(coordinator.data)
+    assert hass.states.get("sensor.whatpulse_realtime_keys").state == "1.23"
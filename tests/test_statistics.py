@@ -0,0 +1,47 @@
+"""Tests for the long-term statistics import."""
+
+from homeassistant.setup import async_setup_component
+
+from custom_components.whatpulse import statistics
+from custom_components.whatpulse.const import DOMAIN, SENSOR_TYPES
+from custom_components.whatpulse.statistics import WhatPulseStatisticsImporter
+
+
+def test_unpulsed_sums_add_up_across_pulses(monkeypatch):
+    """Lifetime counters are their own sum; unpulsed sums keep growing after a pulse."""
+    imported = {}
+    monkeypatch.setattr(
+        statistics,
+        "async_add_external_statistics",
+        lambda hass, metadata, rows: imported.setdefault(metadata["statistic_id"], []).extend(rows),
+    )
+
+    importer = WhatPulseStatisticsImporter(None, "1", ["Keys", "UnpulsedKeys"], SENSOR_TYPES)
+    for hour, (keys, unpulsed) in enumerate([(100, 50), (120, 70), (130, 5), (150, 30)]):
+        importer.add_sample(hour * 3600, {"Keys": (keys, "client"), "UnpulsedKeys": (unpulsed, "client")})
+
+    assert [row["sum"] for row in imported[f"{DOMAIN}:1_keys"]] == [100, 120, 130]
+    assert [row["sum"] for row in imported[f"{DOMAIN}:1_unpulsedkeys"]] == [0, 20, 25]
+
+
+async def test_imported_counters_have_no_state_class(recorder_mock, hass, fake_client):
+    """The recorder does not compile statistics for counters that are imported."""
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": [
+                {
+                    "platform": DOMAIN,
+                    "api_type": "client",
+                    "client_api_url": fake_client.client_url(0),
+                    "sensors": ["UnpulsedKeys", "RealtimeKeys"],
+                    "import_statistics": True,
+                }
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert "state_class" not in hass.states.get("sensor.whatpulse_unpulsed_keys").attributes
+    assert hass.states.get("sensor.whatpulse_realtime_keys").attributes["state_class"] == "measurement"
@@ -0,0 +1,56 @@
+"""Tests for the realtime stream."""
+
+import asyncio
+import math
+import time
+
+from homeassistant.setup import async_setup_component
+
+from custom_components.whatpulse.const import DATA_COORDINATORS, DOMAIN
+
+POLL_INTERVAL = 0.05
+MAX_RATE = 2
+DURATION = 2
+
+
+async def test_stream_coalesces_samples(hass, fake_client):
+    """Samples arrive at the poll interval but are published at most max rate times a second."""
+    assert await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": [
+                {
+                    "platform": DOMAIN,
+                    "api_type": "client",
+                    "client_api_url": fake_client.client_url(0),
+                    "sensors": ["RealtimeKeys"],
+                    "realtime_streaming": True,
+                    "stream_poll_interval": POLL_INTERVAL,
+                    "stream_max_rate": MAX_RATE,
+                }
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+
+    stream = hass.data[DOMAIN][DATA_COORDINATORS][0].stream
+    assert stream is not None
+
+    start = time.monotonic()
+    samples, published = stream.samples, stream.published
+    await asyncio.sleep(DURATION)
+    elapsed = time.monotonic() - start
+    samples, published = stream.samples - samples, stream.published - published
+
+    # Many samples, few publishes: the latest sample wins
+    assert samples >= DURATION / POLL_INTERVAL / 2
+    assert 1 <= published <= math.ceil(elapsed * MAX_RATE) + 1
+    assert samples > published * 3
+
+    # The stream, not the coordinator, fetches the realtime subtree
+    assert fake_client.requests["/{client}/v1/realtime"] >= stream.samples
+    assert fake_client.requests["/{client}/v1/all-stats"] == 0
+    assert hass.states.get("sensor.whatpulse_realtime_keys").state == "1.23"
+
+    stream.async_stop()
@@ -0,0 +1,84 @@
+"""Tests for the live lifetime totals."""
+
+from custom_components.whatpulse.totals import LiveTotals
+
+
+def _sample(public, account, unpulsed):
+    """Return a snapshot with the given keys totals and unpulsed keys."""
+    return {
+        "public": {"Keys": str(public)},
+        "client": {"unpulsed": {"keys": unpulsed}, "account-totals": {"keys": account}},
+    }
+
+
+def _run(samples):
+    """Return the live keys total after each (public, account, unpulsed) sample."""
+    totals = LiveTotals(["Keys"])
+    return [totals.values(_sample(*sample))["Keys"][0] for sample in samples]
+
+
+def test_unpulsed_added_to_pulsed_total():
+    """The live total is the highest pulsed total plus the unpulsed keys."""
+    assert _run([(1000, 990, 5), (990, 1000, 7)]) == [1005, 1007]
+
+
+def test_reset_before_pulsed_total_is_carried():
+    """A pulse reset is carried until a pulsed total includes it."""
+    assert _run([(1000, 1000, 50), (1000, 1000, 0), (1000, 1000, 5), (1000, 1050, 5)]) == [
+        1050,
+        1050,
+        1055,
+        1055,
+    ]
+
+
+def test_pulsed_total_before_reset_is_not_counted_twice():
+    """Unpulsed keys a pulsed total already includes are not added until the reset."""
+    assert _run([(1000, 1000, 50), (1000, 1050, 50), (1000, 1050, 0), (1000, 1050, 60)]) == [
+        1050,
+        1050,
+        1050,
+        1110,
+    ]
+
+
+def test_pulse_after_carried_pulse_is_carried():
+    """After a carried pulse reached the pulsed totals, the next reset is carried again."""
+    assert _run(
+        [
+            (1000, 1000, 50),
+            (1000, 1000, 0),
+            (1000, 1050, 5),
+            (1000, 1050, 100),
+            (1000, 1050, 0),
+            (1000, 1050, 10),
+        ]
+    ) == [1050, 1050, 1055, 1150, 1150, 1160]
+
+
+def test_never_decreases():
+    """The live total does not dip while a pulsed total overlaps the unpulsed keys."""
+    assert _run([(1000, 1000, 50), (1000, 1050, 50), (1000, 1050, 0), (1000, 1050, 20)]) == [
+        1050,
+        1050,
+        1050,
+        1070,
+    ]
+
+
+def test_stale_pulsed_total_is_ignored():
+    """A pulsed total falling back neither lowers the live total nor looks like a pulse later."""
+    assert _run([(1000, 1050, 10), (1000, 1040, 10), (1000, 1050, 20)]) == [1060, 1060, 1070]
+
+
+def test_reset_after_pulse_of_another_client_is_carried():
+    """A reset following a pulse of another client keeps the total growing."""
+    assert _run(
+        [
+            (1000, 1000, 50),
+            (1000, 1030, 50),
+            (1000, 1030, 0),
+            (1000, 1030, 10),
+            (1000, 1080, 10),
+        ]
+    ) == [1050, 1050, 1050, 1060, 1090]